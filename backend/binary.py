@@ -0,0 +1,104 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+from .csr import CSRGraph
+
+BINARY_EXTENSION = '.npgraph'
+ARRAYS = ('ids', 'indptr', 'indices', 'positions')
+
+_swap_lock = threading.Lock()
+
+
+def write_binary(path, ids, indptr, indices, positions, labels=None, directed=False, simple=True):
+    """
+        A binary graph is a directory of .npy files plus a small meta.json:
+            ids.npy        vertex ids, stored once
+            indptr.npy     int64 CSR row offsets
+            indices.npy    int32 CSR neighbor indices
+            positions.npy  float64 (x, y) per vertex
+            meta.json      flags and the labels of labelled vertices
+    """
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, 'ids.npy'), np.asarray(ids, dtype=str))
+    np.save(os.path.join(path, 'indptr.npy'), np.asarray(indptr, dtype=np.int64))
+    np.save(os.path.join(path, 'indices.npy'), np.asarray(indices, dtype=np.int32))
+    np.save(os.path.join(path, 'positions.npy'), np.asarray(positions, dtype=np.float64).reshape(-1, 2))
+    meta = {
+        'directed': directed,
+        'simple': simple,
+        'labels': {str(i): vertex_labels for i, vertex_labels in (labels or {}).items()},
+    }
+    with open(os.path.join(path, 'meta.json'), 'w') as meta_file:
+        json.dump(meta, meta_file)
+
+
+def graph_arrays(graph):
+    """The arguments of write_binary after the path, gathered from a Graph."""
+    csr = graph.snapshot()
+    vertices = list(graph.vertex_index.values())
+    positions = np.array([(vertex.x, vertex.y) for vertex in vertices], dtype=np.float64)
+    labels = {i: list(vertex.labels) for i, vertex in enumerate(vertices) if vertex.labels}
+    return csr.ids, csr.indptr, csr.indices, positions, labels, graph.directed, graph.simple
+
+
+def replace_binary(path, arrays):
+    """
+        write_binary into a scratch directory beside `path`, then swap it into
+        place, so readers never see a half-written graph.
+    """
+    scratch = tempfile.mkdtemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        write_binary(os.path.join(scratch, 'new'), *arrays)
+        with _swap_lock:
+            if os.path.exists(path):
+                os.replace(path, os.path.join(scratch, 'old'))
+            os.replace(os.path.join(scratch, 'new'), path)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def save_graph(graph, path):
+    replace_binary(path, graph_arrays(graph))
+
+
+def read_binary(path, mmap_mode='r'):
+    """Arrays of a binary graph, memory-mapped rather than read into memory."""
+    data = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+        for name in ARRAYS
+    }
+    with open(os.path.join(path, 'meta.json'), 'r') as meta_file:
+        meta = json.load(meta_file)
+    data['directed'] = meta['directed']
+    data['simple'] = meta['simple']
+    data['labels'] = {int(i): vertex_labels for i, vertex_labels in meta['labels'].items()}
+    return data
+
+
+def read_csr(path):
+    """A CSRGraph straight over the memory-mapped arrays, without building a Graph."""
+    data = read_binary(path)
+    return CSRGraph(data['ids'], data['indptr'], data['indices'], directed=data['directed'])
+
+
+def json_to_binary(json_path, binary_path):
+    from .definitions import Graph
+
+    graph = Graph(os.path.basename(json_path))
+    with open(json_path, 'r') as graph_file:
+        graph.load_graph_data(json.load(graph_file))
+    save_graph(graph, binary_path)
+
+
+def binary_to_json(binary_path, json_path):
+    from .definitions import Graph
+
+    graph = Graph(os.path.basename(binary_path))
+    graph.load_binary_data(read_binary(binary_path))
+    with open(json_path, 'w') as graph_file:
+        json.dump(graph.graph_data(), graph_file, indent=4)
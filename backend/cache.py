@@ -0,0 +1,72 @@
+from collections import OrderedDict
+import functools
+import inspect
+import threading
+
+import numpy as np
+
+
+class DerivedCache:
+    """
+        Results derived from a graph, valid for one mutation version. A new
+        version drops every entry; within a version at most `maxsize` results
+        are kept, least recently used first out. Safe to share between the Tk
+        thread and a background job; values are computed outside the lock.
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.version = None
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, version, compute):
+        with self.lock:
+            if version != self.version:
+                self.entries.clear()
+                self.version = version
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        value = compute()
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+        with self.lock:
+            if version == self.version:
+                self.entries[key] = value
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# Keyword arguments that change how a result is computed, not what it is.
+EXECUTION_OPTIONS = ('processes', 'progress')
+
+
+def memoized(method):
+    """
+        Cache a Graph method's result until the graph's version changes. The
+        key is the method's arguments with defaults filled in, so `f()` and
+        `f(x=default)` share an entry; execution options such as `processes`
+        and `progress` are left out of it.
+    """
+    signature = inspect.signature(method)
+    if len(signature.parameters) == 1:
+        @functools.wraps(method)
+        def wrapper(self):
+            return self.derived.get((method.__name__,), self.version, lambda: method(self))
+        return wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (method.__name__,) + tuple(
+            (name, value) for name, value in list(bound.arguments.items())[1:]
+            if name not in EXECUTION_OPTIONS
+        )
+        return self.derived.get(key, self.version, lambda: method(self, *args, **kwargs))
+    return wrapper
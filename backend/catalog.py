@@ -0,0 +1,90 @@
+import json
+import os
+
+from .isomorphism import find_isomorphism
+
+INDEX_FILENAME = '.fingerprints'
+
+
+def index_path(directory):
+    return os.path.join(directory, INDEX_FILENAME)
+
+
+def load_index(directory):
+    """
+        index = {
+            'fingerprint': [graph names]
+        }
+    """
+    path = index_path(directory)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as index_file:
+        return json.load(index_file)
+
+
+def save_index(directory, index):
+    path = index_path(directory)
+    temporary = path + '.tmp'
+    with open(temporary, 'w') as index_file:
+        json.dump(index, index_file, indent=4, sort_keys=True)
+    os.replace(temporary, path)
+
+
+def update_index(directory, name, fingerprint):
+    index = load_index(directory)
+    for names in index.values():
+        if name in names:
+            names.remove(name)
+    index = {key: names for key, names in index.items() if names}
+    index.setdefault(fingerprint, []).append(name)
+    save_index(directory, index)
+
+
+def rebuild_index(directory):
+    from .definitions import Graph
+
+    index = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.json'):
+            name = filename[:-len('.json')]
+            graph = Graph(name)
+            with open(os.path.join(directory, filename), 'r') as graph_file:
+                graph.load_graph_data(json.load(graph_file))
+            index.setdefault(graph.fingerprint(), []).append(name)
+    save_index(directory, index)
+    return index
+
+
+def find_isomorphic(graph, directory):
+    """
+        Names of stored graphs isomorphic to `graph`: an index lookup, then
+        exact checks. The index is built on first use; entries whose file
+        has since been deleted are dropped from it.
+    """
+    from .definitions import Graph
+
+    if not os.path.exists(index_path(directory)):
+        rebuild_index(directory)
+    index = load_index(directory)
+    fingerprint = graph.fingerprint()
+    csr = graph.snapshot()
+    matches, missing = [], []
+    for name in index.get(fingerprint, []):
+        path = os.path.join(directory, f"{name}.json")
+        if not os.path.exists(path):
+            missing.append(name)
+            continue
+        candidate = Graph(name)
+        with open(path, 'r') as graph_file:
+            candidate.load_graph_data(json.load(graph_file))
+        if find_isomorphism(csr, candidate.snapshot()) is not None:
+            matches.append(name)
+    if missing:
+        names = [name for name in index[fingerprint] if name not in missing]
+        if names:
+            index[fingerprint] = names
+        else:
+            del index[fingerprint]
+        save_index(directory, index)
+    return matches
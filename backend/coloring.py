@@ -0,0 +1,287 @@
+import heapq
+
+import numpy as np
+
+from .csr import CSRGraph
+from .line_graph import edge_endpoints, line_graph_csr
+
+
+def _undirected(csr):
+    """Neighbor lists with edge directions dropped; loops make a graph uncolourable."""
+    sources = csr.sources()
+    if (sources == csr.indices).any():
+        raise ValueError("Graphs with loops have no proper colouring.")
+    if csr.directed:
+        csr = CSRGraph.from_edges(csr.num_vertices, sources, csr.indices)
+    indptr, indices = csr.indptr.tolist(), csr.indices.tolist()
+    return [indices[indptr[i]:indptr[i + 1]] for i in range(csr.num_vertices)]
+
+
+def _bitsets(neighbors):
+    """Adjacency as one Python int per vertex, bit j set when j is a neighbor."""
+    masks = []
+    for adjacent in neighbors:
+        mask = 0
+        for j in adjacent:
+            mask |= 1 << j
+        masks.append(mask)
+    return masks
+
+
+def _lowest_free(used):
+    """Smallest colour whose bit is not set in `used`."""
+    return (~used & (used + 1)).bit_length() - 1
+
+
+def greedy_coloring(csr, order=None):
+    """
+        First-fit colouring in `order`, largest degree first by default
+        (Welsh-Powell). Returns an int array of colours in vertex order.
+    """
+    neighbors = _undirected(csr)
+    if order is None:
+        order = np.argsort([-len(adjacent) for adjacent in neighbors], kind='stable').tolist()
+    colors = [-1] * len(neighbors)
+    for vertex in order:
+        used = 0
+        for neighbor in neighbors[vertex]:
+            if colors[neighbor] >= 0:
+                used |= 1 << colors[neighbor]
+        colors[vertex] = _lowest_free(used)
+    return np.array(colors, dtype=np.int64)
+
+
+def dsatur_coloring(csr):
+    """
+        Brélaz's DSatur: repeatedly colour the vertex with the most distinct
+        colours among its neighbors. Saturation is kept as a bitset per vertex
+        and the next vertex comes from a heap with lazy deletion.
+    """
+    neighbors = _undirected(csr)
+    n = len(neighbors)
+    colors = [-1] * n
+    saturation = [0] * n
+    heap = [(0, -len(neighbors[vertex]), vertex) for vertex in range(n)]
+    heapq.heapify(heap)
+    while heap:
+        negative_saturation, _, vertex = heapq.heappop(heap)
+        if colors[vertex] >= 0 or -negative_saturation != bin(saturation[vertex]).count('1'):
+            continue
+        color = _lowest_free(saturation[vertex])
+        colors[vertex] = color
+        bit = 1 << color
+        for neighbor in neighbors[vertex]:
+            if colors[neighbor] < 0 and not saturation[neighbor] & bit:
+                saturation[neighbor] |= bit
+                heapq.heappush(heap, (-bin(saturation[neighbor]).count('1'), -len(neighbors[neighbor]), neighbor))
+    return np.array(colors, dtype=np.int64)
+
+
+# Search nodes between progress reports in exact_coloring.
+PROGRESS_NODES = 4096
+
+
+def _greedy_clique(masks):
+    """A maximal clique grown from the highest-degree vertex; its size bounds the chromatic number."""
+    if not masks:
+        return 0
+    candidates = (1 << len(masks)) - 1
+    size = 0
+    while candidates:
+        vertex = max(_bits(candidates), key=lambda v: bin(masks[v] & candidates).count('1'))
+        size += 1
+        candidates &= masks[vertex]
+    return size
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def exact_coloring(csr, lower_bound=None, initial=None, progress=None):
+    """
+        Optimal vertex colouring by DSatur-ordered branch and bound over
+        bitsets: each colour class and each neighborhood is a Python int, so
+        checking a colour is one AND. `initial` is a known proper colouring
+        to improve on (DSatur's by default). Exponential in the worst case;
+        meant for graphs of up to a few hundred vertices. `progress`, if
+        given, is called every few thousand search nodes with the lower
+        bound over the best colour count, so a job can cancel it.
+        Returns (number of colours, int array of colours).
+    """
+    masks = _bitsets(_undirected(csr))
+    n = len(masks)
+    best = dsatur_coloring(csr) if initial is None else initial
+    best_count = int(best.max()) + 1 if n else 0
+    lower = max(_greedy_clique(masks), lower_bound or 0)
+    if best_count <= lower:
+        return best_count, best
+
+    classes = []
+    colors = [-1] * n
+    nodes = 0
+
+    def search(uncolored):
+        nonlocal best, best_count, nodes
+        nodes += 1
+        if progress is not None and nodes % PROGRESS_NODES == 0:
+            progress(lower / best_count)
+        if not uncolored:
+            best, best_count = np.array(colors, dtype=np.int64), len(classes)
+            return best_count <= lower
+        # Most saturated uncoloured vertex, ties broken by uncoloured degree.
+        vertex, vertex_saturation, vertex_degree = -1, -1, -1
+        for candidate in _bits(uncolored):
+            adjacent = masks[candidate]
+            saturation = sum(1 for members in classes if members & adjacent)
+            degree = bin(adjacent & uncolored).count('1')
+            if (saturation, degree) > (vertex_saturation, vertex_degree):
+                vertex, vertex_saturation, vertex_degree = candidate, saturation, degree
+        bit, adjacent = 1 << vertex, masks[vertex]
+        rest = uncolored ^ bit
+        for color, members in enumerate(classes):
+            if not members & adjacent:
+                classes[color] |= bit
+                colors[vertex] = color
+                done = search(rest)
+                classes[color] ^= bit
+                if done:
+                    return True
+        # A new colour only helps if it still beats the best colouring found.
+        if len(classes) + 1 < best_count:
+            classes.append(bit)
+            colors[vertex] = len(classes) - 1
+            done = search(rest)
+            classes.pop()
+            if done:
+                return True
+        colors[vertex] = -1
+        return False
+
+    search((1 << n) - 1)
+    return best_count, best
+
+
+def misra_gries_edge_coloring(csr):
+    """
+        Proper edge colouring with at most max degree + 1 colours (Misra and
+        Gries). Colours are given per row of `edge_endpoints(csr)`, so they
+        line up with the vertices of the line graph.
+    """
+    if csr.directed:
+        raise ValueError("Edge colouring needs an undirected graph.")
+    endpoints = edge_endpoints(csr)
+    if len(endpoints) != len(np.unique(endpoints, axis=0)) or (csr.sources() == csr.indices).any():
+        raise ValueError("Edge colouring needs a simple graph.")
+    # color_at[x] maps each colour used at x to the neighbor reached through it.
+    color_at = [{} for _ in range(csr.num_vertices)]
+
+    def free_color(x):
+        used = color_at[x]
+        color = 0
+        while color in used:
+            color += 1
+        return color
+
+    def set_color(x, y, color):
+        color_at[x][color] = y
+        color_at[y][color] = x
+
+    def unset_color(x, color):
+        y = color_at[x].pop(color)
+        del color_at[y][color]
+
+    def color_of(x, y):
+        for color, other in color_at[x].items():
+            if other == y:
+                return color
+        return None
+
+    for u, v in endpoints.tolist():
+        # Maximal fan at u starting with the uncoloured edge uv.
+        fan, in_fan = [v], {v}
+        grown = True
+        while grown:
+            grown = False
+            last = color_at[fan[-1]]
+            for color, w in color_at[u].items():
+                if w not in in_fan and color not in last:
+                    fan.append(w)
+                    in_fan.add(w)
+                    grown = True
+                    break
+        c, d = free_color(u), free_color(fan[-1])
+
+        # Swap c and d along the path from u alternating d, c, d, ...
+        path, x, color = [], u, d
+        while color in color_at[x]:
+            y = color_at[x][color]
+            path.append((x, y, color))
+            x, color = y, (c if color == d else d)
+        for x, _, color in path:
+            unset_color(x, color)
+        for x, y, color in path:
+            set_color(x, y, c if color == d else d)
+
+        # The fan up to the first member where d is free is still a fan; rotate it.
+        end = 0
+        for end, w in enumerate(fan):
+            if end and color_of(u, w) in color_at[fan[end - 1]]:
+                end -= 1
+                break
+            if d not in color_at[w]:
+                break
+        shifted = [color_of(u, fan[i + 1]) for i in range(end)]
+        for i in range(1, end + 1):
+            unset_color(u, color_of(u, fan[i]))
+        for i, color in enumerate(shifted):
+            set_color(u, fan[i], color)
+        set_color(u, fan[end], d)
+
+    colors = [color_of(u, v) for u, v in endpoints.tolist()]
+    return np.array(colors, dtype=np.int64)
+
+
+def chromatic_index(csr, progress=None):
+    """
+        Returns (chromatic index, edge colours per `edge_endpoints` row). By
+        Vizing's theorem it is the max degree or one more; Misra-Gries gives the
+        upper bound and an exact colouring of the line graph settles which.
+    """
+    colors = misra_gries_edge_coloring(csr)
+    if not len(colors):
+        return 0, colors
+    max_degree = int(csr.degrees().max())
+    if colors.max() + 1 <= max_degree:
+        return max_degree, colors
+    return exact_coloring(line_graph_csr(csr), lower_bound=max_degree, initial=colors, progress=progress)
+
+
+def coloring_conflicts(csr, colors):
+    """
+        Edges whose endpoints share a colour, as an (k, 2) array of vertex
+        indices, found in one vectorized pass. Negative colours mean uncoloured
+        and never conflict.
+    """
+    colors = np.asarray(colors)
+    sources = csr.sources()
+    clash = (colors[sources] == colors[csr.indices]) & (colors[sources] >= 0)
+    if not csr.directed:
+        clash &= sources <= csr.indices
+    return np.column_stack((sources[clash], csr.indices[clash]))
+
+
+def edge_coloring_conflicts(endpoints, colors):
+    """
+        Vertices where two edges of the same colour meet, given edges as rows of
+        `endpoints` and one colour per row. Vectorized; returns vertex indices.
+    """
+    endpoints, colors = np.asarray(endpoints, dtype=np.int64), np.asarray(colors, dtype=np.int64)
+    if not len(colors):
+        return np.zeros(0, dtype=np.int64)
+    keys = endpoints.T.ravel() * (int(colors.max()) + 1) + np.tile(colors, 2)
+    unique, counts = np.unique(keys, return_counts=True)
+    return np.unique(unique[counts > 1] // (int(colors.max()) + 1))
@@ -0,0 +1,179 @@
+import numpy as np
+
+
+def gather_neighbors(indptr, indices, frontier):
+    """
+        Concatenated neighbor indices of every vertex in `frontier`,
+        without a Python loop over the frontier.
+    """
+    starts = indptr[frontier]
+    counts = indptr[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=indices.dtype)
+    shift = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return indices[shift + np.arange(total)]
+
+
+def bfs_levels(indptr, indices, source):
+    """
+        Hop distances from `source` (one index or an array of them) over raw
+        CSR arrays; unreachable vertices are -1.
+    """
+    distances = np.full(len(indptr) - 1, -1, dtype=np.int32)
+    frontier = np.unique(np.atleast_1d(source)).astype(np.int64)
+    distances[frontier] = 0
+    level = 0
+    while len(frontier):
+        level += 1
+        reached = gather_neighbors(indptr, indices, frontier)
+        reached = np.unique(reached[distances[reached] < 0])
+        distances[reached] = level
+        frontier = reached.astype(np.int64)
+    return distances
+
+
+class CSRGraph:
+    """
+        Frozen compressed-sparse-row snapshot of a Graph.
+
+        Vertex i is `ids[i]`; its neighbors are
+        `indices[indptr[i]:indptr[i + 1]]`, repeated once per parallel edge.
+    """
+    def __init__(self, ids, indptr, indices, directed=False):
+        self.ids = ids
+        self._index = None
+        self.indptr = np.ascontiguousarray(indptr, dtype=np.int64)
+        self.indices = np.ascontiguousarray(indices, dtype=np.int32)
+        self.directed = directed
+        self.indptr.setflags(write=False)
+        self.indices.setflags(write=False)
+
+    @classmethod
+    def from_graph(cls, graph):
+        ids = list(graph.vertex_index)
+        index = {vertex_id: i for i, vertex_id in enumerate(ids)}
+        adjacency = [graph.edges[vertex_id] for vertex_id in ids]
+        key_counts = np.fromiter((len(neighbors) for neighbors in adjacency), dtype=np.int64, count=len(ids))
+        total = int(key_counts.sum())
+        indices = np.fromiter(
+            (index[neighbor_id] for neighbors in adjacency for neighbor_id in neighbors),
+            dtype=np.int32, count=total
+        )
+        multiplicity = np.fromiter(
+            (count for neighbors in adjacency for count in neighbors.values()),
+            dtype=np.int64, count=total
+        )
+        if (multiplicity != 1).any():
+            indices = np.repeat(indices, multiplicity)
+            owners = np.repeat(np.arange(len(ids)), key_counts)
+            degrees = np.bincount(owners, weights=multiplicity, minlength=len(ids)).astype(np.int64)
+        else:
+            degrees = key_counts
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        return cls(ids, indptr, indices, directed=graph.directed)
+
+    @classmethod
+    def from_edges(cls, num_vertices, sources, targets, ids=None, directed=False):
+        """
+            Build a snapshot from parallel arrays of integer endpoints. Undirected
+            edges are given once and stored in both directions.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if not directed:
+            sources, targets = np.concatenate((sources, targets)), np.concatenate((targets, sources))
+        order = np.argsort(sources, kind='stable')
+        degrees = np.bincount(sources, minlength=num_vertices)
+        indptr = np.zeros(num_vertices + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        if ids is None:
+            ids = [str(i) for i in range(num_vertices)]
+        return cls(ids, indptr, targets[order], directed=directed)
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = {vertex_id: i for i, vertex_id in enumerate(self.ids)}
+        return self._index
+
+    @property
+    def num_vertices(self):
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self):
+        if self.directed:
+            return len(self.indices)
+        return len(self.indices) // 2
+
+    def sources(self):
+        """Source index of every entry of `indices`."""
+        return np.repeat(np.arange(self.num_vertices, dtype=np.int32), self.degrees())
+
+    def neighbors(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def degrees(self):
+        return np.diff(self.indptr)
+
+    def bfs(self, source):
+        """Hop distances from `source`, or from the nearest of several sources; unreachable vertices are -1."""
+        return bfs_levels(self.indptr, self.indices, source)
+
+    def is_bipartite(self):
+        components = self.connected_components()
+        _, roots = np.unique(components, return_index=True)
+        levels = self.bfs(roots)
+        return bool(((levels[self.sources()] - levels[self.indices]) % 2 == 1).all())
+
+    def girth(self):
+        """Length of the shortest cycle of the undirected graph, or inf if it is a forest."""
+        indptr = self.indptr.tolist()
+        indices = self.indices.tolist()
+        best = float('inf')
+        for source in range(self.num_vertices):
+            distances = {source: 0}
+            parents = {source: -1}
+            frontier = [source]
+            while frontier and 2 * distances[frontier[0]] + 1 < best:
+                reached = []
+                for u in frontier:
+                    skipped_parent = False
+                    for w in indices[indptr[u]:indptr[u + 1]]:
+                        if w == parents[u] and not skipped_parent:
+                            skipped_parent = True
+                        elif w not in distances:
+                            distances[w] = distances[u] + 1
+                            parents[w] = u
+                            reached.append(w)
+                        else:
+                            best = min(best, distances[u] + distances[w] + 1)
+                frontier = reached
+        return best
+
+    def connected_components(self):
+        """
+            Component number of every vertex (weak components when directed),
+            numbered in order of first appearance.
+        """
+        n = self.num_vertices
+        component = np.arange(n)
+        sources, targets = self.sources(), self.indices
+        while True:
+            low, high = component[sources], component[targets]
+            if (low == high).all():
+                break
+            # Hook each root onto the smallest root it touches, then compress paths.
+            np.minimum.at(component, high, low)
+            np.minimum.at(component, low, high)
+            while True:
+                jumped = component[component]
+                if (jumped == component).all():
+                    break
+                component = jumped
+        _, first, labels = np.unique(component, return_index=True, return_inverse=True)
+        rank = np.empty(len(first), dtype=np.int64)
+        rank[np.argsort(first)] = np.arange(len(first))
+        return rank[labels]
@@ -1,11 +1,29 @@
-from collections import deque
 import numpy as np
+import hashlib
 import json
 import random
 import string
 import os
+import tempfile
 import math
-from itertools import permutations
+from itertools import combinations
+
+from .csr import CSRGraph
+from .distances import all_sources_distances
+from .isomorphism import find_isomorphism, wl_hash
+from .catalog import index_path, update_index
+from .binary import BINARY_EXTENSION, read_binary, save_graph
+from .spatial import SpatialHash
+from .cache import DerivedCache, memoized
+from .coloring import (
+    chromatic_index, coloring_conflicts, dsatur_coloring, exact_coloring, greedy_coloring,
+    misra_gries_edge_coloring,
+)
+from .layout import fruchterman_reingold, relax
+from .shortest_paths import EdgeWeights, astar, dijkstra, path_to
+from .traversal import bfs_events, dfs_events
+from .line_graph import edge_endpoints, iter_line_graph_edges, line_graph_size
+from .importers import edge_csr, edge_list_name, read_edge_list
 
 
 def generate_random_id(length=8):
@@ -13,14 +31,32 @@ def generate_random_id(length=8):
     random_id = ''.join(random.choices(characters, k=length))
     return random_id
 
+def generate_random_ids(count, length=8):
+    characters = np.frombuffer((string.ascii_letters + string.digits).encode(), dtype=np.uint8)
+    codes = characters[np.random.default_rng().integers(0, len(characters), size=(count, length))]
+    return codes.view(f'S{length}').ravel().astype(str).tolist()
+
 
-def get_data_path(filename):
+def get_data_path(filename, binary=False):
     directory = './storage'
-    unique_filename = f"{filename}.json"
+    if filename.endswith(BINARY_EXTENSION):
+        filename, binary = filename[:-len(BINARY_EXTENSION)], True
+    elif filename.endswith('.json'):
+        filename = filename[:-len('.json')]
+    unique_filename = f"{filename}{BINARY_EXTENSION if binary else '.json'}"
     if not os.path.exists(directory):
         os.makedirs(directory)
     return os.path.join(directory, unique_filename)
 
+def write_graph_data(path, data):
+    """Write graph data as JSON, then rename it into place, so a crash never leaves a half-written graph."""
+    # mkstemp names are unique per writer: a background compaction and a save can target one path.
+    handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    os.chmod(temporary, 0o644)
+    with os.fdopen(handle, 'w') as graph_file:
+        json.dump(data, graph_file, indent=4)
+    os.replace(temporary, path)
+
 def int_to_color(integer):
     colorize = {
         "0": "blue",
@@ -36,8 +72,23 @@ def int_to_color(integer):
     }
     return colorize.get(str(integer%10), "black")
 
+# Edge lists with more vertices than this are placed at random on import.
+EDGE_LIST_LAYOUT_LIMIT = 5000
+
+def canvas_size(canvas, default=(500, 400)):
+    if canvas is None:
+        return default
+    return (canvas.winfo_width(), canvas.winfo_height())
+
 class Vertex:
-    def __init__(self, canvas, x, y, id=None, radius=10, color='black', labels=[]):
+    """
+        A graph vertex. Vertices are headless: nothing is drawn until
+        `draw_vertex` binds them to a canvas, so graphs can be built
+        without a display.
+    """
+    __slots__ = ('canvas', 'id', 'x', 'y', 'radius', 'color', 'selected', 'graph', 'vertex_id', 'label_items', '_labels')
+
+    def __init__(self, canvas, x, y, id=None, radius=10, color='black', labels=()):
         self.canvas = canvas
         self.id = id if id else generate_random_id()
         self.x = x
@@ -45,52 +96,94 @@ class Vertex:
         self.radius = radius
         self.color = color
         self.selected = False
+        self.graph = None
+
+        self.vertex_id = None
+        self.label_items = []
+        self._labels = list(labels)
+
+    @property
+    def labels(self):
+        return self._labels
 
-        self.vertex_id = self.draw_vertex()
-        self.labels = labels
+    @labels.setter
+    def labels(self, labels):
+        if self.graph is not None:
+            self.graph._unindex_labels(self)
+        self._labels = list(labels)
+        if self.graph is not None:
+            self.graph._index_labels(self)
 
-    def draw_vertex(self):
-        return self.canvas.create_oval(
+    @property
+    def is_drawn(self):
+        return self.vertex_id is not None
+
+    def draw_vertex(self, canvas=None):
+        if canvas is not None:
+            self.canvas = canvas
+        self.label_items = []
+        self.vertex_id = self.canvas.create_oval(
             self.x - self.radius, self.y - self.radius,
             self.x + self.radius, self.y + self.radius,
             fill=self.color
         )
+        return self.vertex_id
+
+    def erase(self):
+        if not self.is_drawn:
+            return
+        self.canvas.delete(self.vertex_id, *self.label_items)
+        self.vertex_id = None
+        self.label_items = []
     
     def draw_int_label(self, label: int, color='white'):
-        self.canvas.create_text(
+        self.label_items.append(self.canvas.create_text(
             self.x, self.y,
             text=label, fill=color
-        )
+        ))
 
     def update_position(self, x, y):
+        old_x, old_y = self.x, self.y
         self.x = x
         self.y = y
-        self.canvas.coords(
-            self.vertex_id, self.x - self.radius, self.y - self.radius,
-            self.x + self.radius, self.y + self.radius
-        )
-        self.canvas.coords(self.x, self.y)
+        if self.graph is not None:
+            self.graph.spatial_index.move(self, old_x, old_y)
+            self.graph.weights.move(self.id)
+        if self.is_drawn:
+            self.canvas.coords(
+                self.vertex_id, self.x - self.radius, self.y - self.radius,
+                self.x + self.radius, self.y + self.radius
+            )
+            for item in self.label_items:
+                self.canvas.coords(item, self.x, self.y)
 
     def update_color(self, color):
-        self.canvas.itemconfig(self.vertex_id, fill=color)
+        if self.is_drawn:
+            self.canvas.itemconfig(self.vertex_id, fill=color)
         self.color = color
 
     def contains_point(self, x, y):
         return (self.x - self.radius <= x <= self.x + self.radius) and (self.y - self.radius <= y <= self.y + self.radius)
 
     def set_selected(self):
+        if not self.is_drawn:
+            return
         if self.selected:
             self.canvas.itemconfig(self.vertex_id, outline='red', width=3)
         else:
             self.canvas.itemconfig(self.vertex_id, outline='black', width=1)
 
     def add_label(self, label, overwrite=True):
-        if overwrite:
-            self.labels = []
-        self.labels.append(label)
+        labels = [] if overwrite else self.labels
+        self.labels = labels + [label]
         self.update_labels()
     
     def update_labels(self):
+        if not self.is_drawn:
+            return
+        if self.label_items:
+            self.canvas.delete(*self.label_items)
+            self.label_items = []
         for label in self.labels:
             try:
                 self.update_color(label)
@@ -104,11 +197,24 @@ class Vertex:
 class Graph:
     def __init__(self, name, simple=True, directed=False):
         self.name = name
-        self.vertices = []
-        self.edges = {}
         self.simple = simple
         self.directed = directed
 
+        # id -> Vertex, and label -> {id: Vertex} for constant-time lookups
+        self.vertex_index = {}
+        self.label_index = {}
+        # Adjacency is id -> {neighbor_id: multiplicity}; dicts keep insertion
+        # order, so they behave as ordered sets. Directed graphs also keep the
+        # reverse map so deleting a vertex only touches its incident edges.
+        self.edges = {}
+        self.in_edges = {}
+        self.spatial_index = SpatialHash()
+        # Bumped by every structural change; derived results are cached per version.
+        self.version = 0
+        self.derived = DerivedCache()
+        # Explicit edge weights, parallel to the snapshot; other edges weigh their length.
+        self.weights = EdgeWeights()
+
         self.classes = {
             "cyclic": {
                 "name": "Cyclic Graph",
@@ -135,81 +241,269 @@ class Graph:
                 "params": ["parameter 1", "parameter 2"],
                 "function": self._complete_bipartite_graph
             },
+            "hypercube": {
+                "name": "Hypercube Graph",
+                "params": ["dimension"],
+                "function": self._hypercube_graph
+            },
+            "grid": {
+                "name": "Grid Graph",
+                "params": ["rows", "columns"],
+                "function": self._grid_graph
+            },
+            "torus": {
+                "name": "Torus Graph",
+                "params": ["rows", "columns"],
+                "function": self._torus_graph
+            },
+            "circulant": {
+                "name": "Circulant Graph",
+                "params": ["number of nodes", "largest jump"],
+                "function": self._circulant_graph
+            },
+            "kneser": {
+                "name": "Kneser Graph",
+                "params": ["set size", "subset size"],
+                "function": self._kneser_graph
+            },
+            "gnp": {
+                "name": "Random Graph G(n, p)",
+                "params": ["number of nodes", "edge probability (percent)"],
+                "function": self._random_gnp_graph
+            },
+            "gnm": {
+                "name": "Random Graph G(n, m)",
+                "params": ["number of nodes", "number of edges"],
+                "function": self._random_gnm_graph
+            },
         }
     
     def __str__(self):
         return f"{self.name}:\nVertices: {self.vertices}\nEdges: {self.edges}\n"
+
+    @property
+    def vertices(self):
+        return list(self.vertex_index.values())
     
     def get_vertex_by_id(self, id: str) -> Vertex:
-        for vertex in self.vertices:
-            if vertex.id == id:
-                return vertex
-        return None
+        return self.vertex_index.get(id)
     def get_vertex_by_label(self, label) -> Vertex:
-        for vertex in self.vertices:
-            if label in vertex.labels:
-                return vertex
-        return None
+        bucket = self.label_index.get(label)
+        if not bucket:
+            return None
+        return next(iter(bucket.values()))
     def get_vertices_by_label(self, label) -> Vertex:
-        vertices = []
-        for vertex in self.vertices:
-            if label in vertex.labels:
-                vertices.append(vertex)
-        return vertices
+        return list(self.label_index.get(label, {}).values())
     def get_neighbors(self, vertex: Vertex):
-        neighbors = []
-        for neighbor_id in self.edges[vertex.id]:
-            neighbor = self.get_vertex_by_id(neighbor_id)
-            neighbors.append(neighbor)
-        return neighbors
+        return [self.vertex_index[neighbor_id] for neighbor_id in self.edges[vertex.id]]
+    def has_vertex(self, vertex: Vertex):
+        return self.vertex_index.get(vertex.id) is vertex
+
+    def _index_labels(self, vertex: Vertex):
+        for label in vertex.labels:
+            self.label_index.setdefault(label, {})[vertex.id] = vertex
+    def _unindex_labels(self, vertex: Vertex):
+        for label in vertex.labels:
+            bucket = self.label_index.get(label)
+            if bucket is not None:
+                bucket.pop(vertex.id, None)
+                if not bucket:
+                    del self.label_index[label]
     
     def remove_all_labels(self):
         for vertex in self.vertices:
-            vertex.labels = []
+            vertex._labels = []
+        self.label_index = {}
     
     def create_vertex(self, vertex: Vertex):
-        if vertex.id in self.vertices:
+        if vertex.id in self.vertex_index:
             raise ValueError(f"Vertex with id '{vertex.id}' already exists.")
-        self.vertices.append(vertex)
-        self.edges[vertex.id] = []
+        self.version += 1
+        self.vertex_index[vertex.id] = vertex
+        self.edges[vertex.id] = {}
+        if self.directed:
+            self.in_edges[vertex.id] = {}
+        vertex.graph = self
+        self._index_labels(vertex)
+        self.spatial_index.insert(vertex)
     def remove_vertex(self, vertex: Vertex):
-        if vertex not in self.vertices:
+        if not self.has_vertex(vertex):
             raise ValueError(f"Vertex with label '{vertex.id}' doesn't exist.")
-        self.vertices.remove(vertex)
-        for connected_vertices in self.edges.values():
-            if vertex.id in connected_vertices:
-                connected_vertices.remove(vertex.id)
+        self.version += 1
+        self._unindex_labels(vertex)
+        self.spatial_index.remove(vertex)
+        self.weights.forget_vertex(vertex.id)
+        del self.vertex_index[vertex.id]
+        vertex.graph = None
+        if self.directed:
+            for neighbor_id in self.edges[vertex.id]:
+                self.in_edges[neighbor_id].pop(vertex.id, None)
+            for neighbor_id in self.in_edges.pop(vertex.id):
+                self.edges[neighbor_id].pop(vertex.id, None)
+        else:
+            for neighbor_id in list(self.edges[vertex.id]):
+                # A loop lives in this vertex's own row, which goes below.
+                if neighbor_id != vertex.id:
+                    self.edges[neighbor_id].pop(vertex.id, None)
         del self.edges[vertex.id]
-            
+
+    def _link(self, v1_id, v2_id):
+        self.version += 1
+        neighbors = self.edges[v1_id]
+        neighbors[v2_id] = neighbors.get(v2_id, 0) + 1
+        if self.directed:
+            sources = self.in_edges[v2_id]
+            sources[v1_id] = sources.get(v1_id, 0) + 1
+    def _unlink(self, v1_id, v2_id):
+        neighbors = self.edges[v1_id]
+        if v2_id not in neighbors:
+            return
+        self.version += 1
+        if neighbors[v2_id] > 1:
+            neighbors[v2_id] -= 1
+        else:
+            del neighbors[v2_id]
+            self.weights.unset(v1_id, v2_id)
+        if self.directed:
+            sources = self.in_edges[v2_id]
+            if sources[v1_id] > 1:
+                sources[v1_id] -= 1
+            else:
+                del sources[v1_id]
 
     def create_edge(self, v1: Vertex, v2: Vertex):
-        if v1 not in self.vertices or v2 not in self.vertices:
+        if not self.has_vertex(v1) or not self.has_vertex(v2):
             raise ValueError("Both vertices must be in the graph")
         if self.simple:
             if v2.id in self.edges[v1.id] or v1.id in self.edges[v2.id]:
                 return ValueError("Edge already exists in graph.")
             if v1 == v2:
                 raise ValueError("Vertex can not share the same vertex.")
-        self.edges[v1.id].append(v2.id)
+        self._link(v1.id, v2.id)
         if not self.directed:
-            self.edges[v2.id].append(v1.id)
+            self._link(v2.id, v1.id)
     def remove_edge(self, v1, v2):
-        if v1 in self.vertices and v2 in self.vertices:
-            if v2 in self.edges[v1.id]:
-                self.edges[v1.id].remove(v2.id)
-            if v1 in self.edges[v2.id]:
-                self.edges[v2.id].remove(v1.id)
+        if self.has_vertex(v1) and self.has_vertex(v2):
+            self._unlink(v1.id, v2.id)
+            if not self.directed:
+                self._unlink(v2.id, v1.id)
         else:
             raise ValueError("Both vertices must be in the graph")
     
+    def set_edge_weight(self, v1: Vertex, v2: Vertex, weight):
+        if v2.id not in self.edges.get(v1.id, ()):
+            raise ValueError("Edge isn't in the graph.")
+        if weight < 0:
+            raise ValueError("Edge weights can't be negative.")
+        csr = self.snapshot()
+        self.weights.assign(csr, [csr.index[v1.id]], [csr.index[v2.id]], [weight])
+
+    def edge_weight(self, v1: Vertex, v2: Vertex):
+        weight = self.weights.get(v1.id, v2.id)
+        if weight is None:
+            return math.hypot(v1.x - v2.x, v1.y - v2.y)
+        return weight
+
+    def add_vertices(self, positions, canvas=None, ids=None):
+        """
+            Create one vertex per (x, y) row of `positions` and return them in
+            order. `ids` must be new and distinct; random ones by default.
+        """
+        self.version += 1
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if ids is None:
+            ids = generate_random_ids(len(positions))
+            if len(set(ids)) < len(ids) or not self.vertex_index.keys().isdisjoint(ids):
+                # A collision among the random ids: draw them one at a time instead.
+                return [self._create_new_vertex(canvas, x, y) for x, y in positions.tolist()]
+        elif len(ids) != len(positions) or len(set(ids)) < len(ids) or not self.vertex_index.keys().isdisjoint(ids):
+            raise ValueError("Vertex ids must be new and one per position.")
+        vertices = [Vertex(canvas, x, y, vertex_id) for vertex_id, (x, y) in zip(ids, positions.tolist())]
+        self.vertex_index.update(zip(ids, vertices))
+        self.edges.update({vertex_id: {} for vertex_id in ids})
+        if self.directed:
+            self.in_edges.update({vertex_id: {} for vertex_id in ids})
+        for vertex in vertices:
+            vertex.graph = self
+        self.spatial_index.insert_many(vertices, positions)
+        return vertices
+
+    def _create_new_vertex(self, canvas, x, y):
+        vertex = Vertex(canvas, x, y)
+        while vertex.id in self.vertex_index:
+            vertex.id = generate_random_id()
+        self.create_vertex(vertex)
+        return vertex
+
+    def add_edges(self, vertices, sources, targets):
+        """
+            Bulk create_edge between vertices[sources[k]] and vertices[targets[k]].
+            On simple graphs, loops and repeated edges are skipped. The new
+            edges are sorted into CSR rows and merged a row at a time, so the
+            per-edge work is all in numpy.
+        """
+        self.version += 1
+        ids = [vertex.id for vertex in vertices]
+        sources = np.asarray(sources, dtype=np.int64).ravel()
+        targets = np.asarray(targets, dtype=np.int64).ravel()
+        if self.simple:
+            keep = sources != targets
+            sources, targets = sources[keep], targets[keep]
+            if self.directed:
+                sources, targets = self._new_arcs(ids, sources, targets)
+        self._merge_adjacency(self.edges, ids, edge_csr(ids, sources, targets, self.directed))
+        if self.directed:
+            self._merge_adjacency(self.in_edges, ids, edge_csr(ids, targets, sources, directed=True))
+
+    def _new_arcs(self, ids, sources, targets):
+        """
+            A simple directed graph joins two vertices at most once, either
+            way round: keep the first arc of each pair not joined already.
+        """
+        n = len(ids)
+        keys = np.minimum(sources, targets) * n + np.maximum(sources, targets)
+        order = np.argsort(keys, kind='stable')
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = keys[order][1:] != keys[order][:-1]
+        keep = np.sort(order[first])
+        sources, targets = sources[keep], targets[keep]
+        joined = np.array([bool(self.edges[vertex_id]) for vertex_id in ids], dtype=bool)
+        check = np.flatnonzero(joined[sources] | joined[targets]) if n else np.zeros(0, dtype=np.int64)
+        if len(check):
+            edges = self.edges
+            old = [
+                k for k, source, target in zip(check.tolist(), sources[check].tolist(), targets[check].tolist())
+                if ids[target] in edges[ids[source]] or ids[source] in edges[ids[target]]
+            ]
+            if old:
+                keep = np.ones(len(sources), dtype=bool)
+                keep[old] = False
+                sources, targets = sources[keep], targets[keep]
+        return sources, targets
+
+    def neighbor_ids(self, vertex_id):
+        """Neighbor ids of a vertex, repeated once per parallel edge."""
+        return [
+            neighbor_id
+            for neighbor_id, count in self.edges[vertex_id].items()
+            for _ in range(count)
+        ]
+
     def degrees(self):
-        return [len(neighbors) for neighbors in self.edges.values()]
+        return self.snapshot().degrees().tolist()
     
     def clear(self):
-        self.vertices = []
+        self.version += 1
+        for vertex in self.vertex_index.values():
+            vertex.graph = None
         self.edges = {}
+        self.in_edges = {}
+        self.vertex_index = {}
+        self.label_index = {}
+        self.weights.clear()
+        self.spatial_index.clear()
     
-    def import_graph_data(self, filename, canvas):
+    def import_graph_data(self, filename, canvas=None, binary=False):
         """
             data = {
                 'vertex_id': {
@@ -221,124 +515,329 @@ class Graph:
         """
         self.clear()
         self.name = filename
-        path = get_data_path(filename)
+        path = get_data_path(filename, binary)
+        if path.endswith(BINARY_EXTENSION):
+            return self.load_binary_data(read_binary(path), canvas)
         with open(path, 'r') as graph_data:
             data = json.load(graph_data)
-        
+        self.load_graph_data(data, canvas)
+
+    def import_edge_list(self, path, fmt=None, canvas=None, progress=None):
+        """
+            Replace the graph with a SNAP, Matrix Market or DIMACS edge list
+            (see backend.importers), keeping the file's vertex names as ids.
+            Adjacency is filled a row at a time from a CSR of the edges, and
+            weights, if the file has them, go straight into the weight array,
+            so no per-edge Python calls. On simple graphs, loops, repeats and
+            (when directed) the second of two opposite arcs are dropped, as
+            create_edge would. Small graphs get a spring layout, big ones
+            random positions until one is asked for.
+        """
+        ids, heads, tails, weights, directed = read_edge_list(path, fmt, simple=self.simple, progress=progress)
+        if weights is not None and (weights < 0).any():
+            raise ValueError("Edge weights can't be negative.")
+        self.clear()
+        self.name = edge_list_name(path)
+        self.directed = directed
+        csr = edge_csr(ids, heads, tails, directed)
+        width, height = canvas_size(canvas)
+        if len(ids) <= EDGE_LIST_LAYOUT_LIMIT:
+            positions = fruchterman_reingold(csr, width=width, height=height)
+        else:
+            positions = np.random.default_rng().uniform((0, 0), (width, height), size=(len(ids), 2))
+        self.add_vertices(positions, canvas, ids=ids)
+        self._merge_adjacency(self.edges, ids, csr)
+        if directed:
+            self._merge_adjacency(self.in_edges, ids, edge_csr(ids, tails, heads, directed=True))
+        if weights is not None:
+            self.weights.assign(csr, heads, tails, weights)
+        self.version += 1
+
+    def _merge_adjacency(self, adjacency, ids, csr):
+        """Add each CSR row to the neighbor dict of its id; one dict.update per row on simple graphs."""
+        neighbor_ids = np.array(ids, dtype=object)[csr.indices].tolist()
+        rows = np.flatnonzero(np.diff(csr.indptr))
+        bounds = zip(rows.tolist(), csr.indptr[rows].tolist(), csr.indptr[rows + 1].tolist())
+        for i, start, end in bounds:
+            vertex_id = ids[i]
+            row = adjacency[vertex_id]
+            if self.simple:
+                # Multiplicities are all 1, so an edge already there is just rewritten.
+                if row:
+                    row.update(dict.fromkeys(neighbor_ids[start:end], 1))
+                else:
+                    adjacency[vertex_id] = dict.fromkeys(neighbor_ids[start:end], 1)
+            else:
+                for neighbor_id in neighbor_ids[start:end]:
+                    row[neighbor_id] = row.get(neighbor_id, 0) + 1
+
+    def load_graph_data(self, data, canvas=None):
         for vertex_id, vertex_data in data.items():
-            self.edges[vertex_id] = vertex_data['neighbors']
             vertex = Vertex(canvas, *vertex_data['position'], id=vertex_id, labels=vertex_data['labels'])
-            self.vertices.append(vertex)
+            self.create_vertex(vertex)
+        for vertex_id, vertex_data in data.items():
+            for neighbor_id in vertex_data['neighbors']:
+                self._link(vertex_id, neighbor_id)
+        weighted = [
+            (vertex_id, neighbor_id, weight)
+            for vertex_id, vertex_data in data.items()
+            for neighbor_id, weight in vertex_data.get('weights', {}).items()
+        ]
+        if weighted:
+            csr = self.snapshot()
+            sources, targets, weights = zip(*weighted)
+            index = csr.index
+            self.weights.assign(csr, [index[i] for i in sources], [index[i] for i in targets], weights)
 
-    def export_graph_data(self, filename='graph_data'):
-        if filename in self.classes.keys():
-            raise NameError("Graph can not be named this!")
-        
+    def load_binary_data(self, data, canvas=None):
+        self.directed = data['directed']
+        self.simple = data['simple']
+        ids = data['ids'].tolist()
+        labels = data['labels']
+        for i, (vertex_id, (x, y)) in enumerate(zip(ids, data['positions'].tolist())):
+            self.create_vertex(Vertex(canvas, x, y, id=vertex_id, labels=labels.get(i, ())))
+        indptr = data['indptr'].tolist()
+        indices = data['indices'].tolist()
+        for i, vertex_id in enumerate(ids):
+            for j in indices[indptr[i]:indptr[i + 1]]:
+                self._link(vertex_id, ids[j])
+
+    def graph_data(self):
         data = {}
+        weights = {}
+        for vertex_id, neighbor_id, weight in self.weights.items():
+            weights.setdefault(vertex_id, {})[neighbor_id] = weight
         for vertex in self.vertices:
             vertex_data = {}
-            vertex_data['neighbors'] = self.edges[vertex.id]
+            vertex_data['neighbors'] = self.neighbor_ids(vertex.id)
             vertex_data['position'] = (vertex.x, vertex.y)
             vertex_data['labels'] = vertex.labels
+            if vertex.id in weights:
+                vertex_data['weights'] = weights[vertex.id]
             data[vertex.id] = vertex_data
+        return data
+
+    def export_graph_data(self, filename='graph_data', binary=False):
+        if filename in self.classes.keys():
+            raise NameError("Graph can not be named this!")
         
-        path = get_data_path(filename)
-        with open(os.path.join(path), 'w') as graph_file:
-            json.dump(data, graph_file, indent=4)
+        path = get_data_path(filename, binary)
+        if path.endswith(BINARY_EXTENSION):
+            return save_graph(self, path)
+        data = self.graph_data()
+        write_graph_data(path, data)
+        # The index is built on demand (see find_isomorphic); keep it current once it exists.
+        if os.path.exists(index_path(os.path.dirname(path))):
+            update_index(os.path.dirname(path), os.path.basename(path)[:-len('.json')], self.fingerprint())
         return data
+
+    @memoized
+    def fingerprint(self, max_spectrum_vertices=200):
+        """
+            Isomorphism-invariant key: size, degree sequence, Weisfeiler-Lehman
+            hash and a rounded adjacency spectrum. The spectrum is a dense
+            eigendecomposition, so it's skipped past `max_spectrum_vertices`,
+            keeping saves cheap.
+        """
+        csr = self.snapshot()
+        degree_sequence = np.sort(csr.degrees())
+        degree_hash = hashlib.sha1(degree_sequence.tobytes()).hexdigest()[:8]
+        spectrum_hash = 'x'
+        if csr.num_vertices <= max_spectrum_vertices:
+            matrix = np.zeros((csr.num_vertices, csr.num_vertices))
+            np.add.at(matrix, (csr.sources(), csr.indices), 1)
+            if csr.directed:
+                eigenvalues = np.linalg.eigvals(matrix)
+                spectrum = np.sort_complex(np.round(eigenvalues, 6) + 0.0)
+            else:
+                spectrum = np.round(np.linalg.eigvalsh(matrix), 6) + 0.0
+            spectrum_hash = hashlib.sha1(spectrum.tobytes()).hexdigest()[:8]
+        return f"{csr.num_vertices}-{len(csr.indices)}-{degree_hash}-{wl_hash(csr)[:16]}-{spectrum_hash}"
     
 
     # Graph Classes
-    def _cyclic_graph(self, canvas, nodes, radius=100, bump=0, remove_labels=True, star=1):
-        center = (canvas.winfo_width() / 2, canvas.winfo_height() / 2)
-        angle_increment = 2 * math.pi / nodes
-        for i in range(nodes):
-            location = (center[0] + radius * math.cos(i * angle_increment), center[1] + radius * math.sin(i * angle_increment))
-            vertex = Vertex(canvas, *location, labels=[bump + i])
-            self.create_vertex(vertex)
-        
-        for i in range(nodes):
-            self.create_edge(self.get_vertex_by_label(bump + i%nodes), self.get_vertex_by_label(bump+ (i + star)%nodes))
+    def _circle_positions(self, canvas, nodes, radius=100):
+        width, height = canvas_size(canvas)
+        angles = np.arange(nodes) * (2 * math.pi / max(nodes, 1))
+        return np.column_stack((width / 2 + radius * np.cos(angles), height / 2 + radius * np.sin(angles)))
 
-        if remove_labels:
-            self.remove_all_labels()
+    def _grid_positions(self, canvas, rows, columns, margin=40):
+        width, height = canvas_size(canvas)
+        xs = np.linspace(margin, width - margin, columns) if columns > 1 else np.array([width / 2])
+        ys = np.linspace(margin, height - margin, rows) if rows > 1 else np.array([height / 2])
+        grid_x, grid_y = np.meshgrid(xs, ys)
+        return np.column_stack((grid_x.ravel(), grid_y.ravel()))
+
+    def _cyclic_graph(self, canvas, nodes, radius=100, star=1):
+        vertices = self.add_vertices(self._circle_positions(canvas, nodes, radius), canvas)
+        indices = np.arange(nodes)
+        self.add_edges(vertices, indices, (indices + star) % nodes)
+        return vertices
 
     def _generalized_petersen_graph(self, canvas, outer, star):
-        self._cyclic_graph(canvas, outer, radius =50, remove_labels=False, star=star)
-        self._cyclic_graph(canvas, outer, bump=outer, remove_labels=False)
-        for i in range(outer):
-            vertex1 = self.get_vertex_by_label(i)
-            vertex2 = self.get_vertex_by_label(outer + i)
-            self.create_edge(vertex1, vertex2)
-        self.remove_all_labels()
+        inner_ring = self._cyclic_graph(canvas, outer, radius=50, star=star)
+        outer_ring = self._cyclic_graph(canvas, outer)
+        indices = np.arange(outer)
+        self.add_edges(inner_ring + outer_ring, indices, indices + outer)
 
     def _wheel_graph(self, canvas, n):
-        center = (canvas.winfo_width() / 2, canvas.winfo_height() / 2)
-        self._cyclic_graph(canvas, n)
-        center_vertex = Vertex(canvas, *center, labels=["center"])
-        self.create_vertex(center_vertex)
-        for v in self.vertices:
-            if "center" not in v.labels:
-                self.create_edge(center_vertex, v)
-        self.remove_all_labels()
+        width, height = canvas_size(canvas)
+        positions = np.vstack((self._circle_positions(canvas, n), [(width / 2, height / 2)]))
+        vertices = self.add_vertices(positions, canvas)
+        rim = np.arange(n)
+        # The rim cycle and the spokes to the centre, vertex n, in one pass.
+        self.add_edges(vertices, np.concatenate((rim, np.full(n, n))), np.concatenate(((rim + 1) % n, rim)))
     
-    def _complete_graph(self, canvas, nodes, radius=100, remove_labels=True):
-        center = (canvas.winfo_width() / 2, canvas.winfo_height() / 2)
-        angle_increment = 2 * math.pi / nodes
-        for i in range(nodes):
-            location = (center[0] + radius * math.cos(i * angle_increment), center[1] + radius * math.sin(i * angle_increment))
-            vertex = Vertex(canvas, *location, labels=[i])
-            self.create_vertex(vertex)
-        for v1 in self.vertices:
-            for v2 in self.vertices:
-                if v1.labels[0] < v2.labels[0]:
-                    self.create_edge(v1, v2)
-        if remove_labels:
-            self.remove_all_labels()
+    def _complete_graph(self, canvas, nodes, radius=100):
+        vertices = self.add_vertices(self._circle_positions(canvas, nodes, radius), canvas)
+        sources, targets = np.triu_indices(nodes, k=1)
+        self.add_edges(vertices, sources, targets)
     
     def _complete_bipartite_graph(self, canvas, nodes1, nodes2, gap=100):
-        width = canvas.winfo_width()
-        middle = canvas.winfo_height()/2
-        tops = []
-        bottoms = []
-        for i in range(nodes1 + nodes2):
-            if i < nodes1:
-                x = i * (width/(nodes1 + 1)) + (width/(nodes1 + 1))
-                y = middle + gap/2
-                vertex = Vertex(canvas, x, y)
-                self.create_vertex(vertex)
-                tops.append(vertex)
-            else:
-                x = (i - nodes1) * (width/(nodes2 + 1)) + (width/(nodes2 + 1))
-                y = middle - gap/2
-                vertex = Vertex(canvas, x, y)
-                self.create_vertex(vertex)
-                bottoms.append(vertex)
-        for vertex1 in tops:
-            for vertex2 in bottoms:
-                self.create_edge(vertex1, vertex2)
+        width, height = canvas_size(canvas)
+        middle = height/2
+        tops = np.column_stack((np.arange(1, nodes1 + 1) * (width/(nodes1 + 1)), np.full(nodes1, middle + gap/2)))
+        bottoms = np.column_stack((np.arange(1, nodes2 + 1) * (width/(nodes2 + 1)), np.full(nodes2, middle - gap/2)))
+        vertices = self.add_vertices(np.concatenate((tops, bottoms)), canvas)
+        self.add_edges(vertices, np.repeat(np.arange(nodes1), nodes2), np.tile(np.arange(nodes2), nodes1) + nodes1)
+
+    def _hypercube_graph(self, canvas, dimension, radius=100):
+        nodes = 1 << dimension
+        vertices = self.add_vertices(self._circle_positions(canvas, nodes, radius), canvas)
+        indices = np.arange(nodes)
+        lowers = [indices[(indices >> bit) & 1 == 0] for bit in range(dimension)]
+        self.add_edges(
+            vertices, np.concatenate(lowers + [indices[:0]]),
+            np.concatenate([lower | (1 << bit) for bit, lower in enumerate(lowers)] + [indices[:0]])
+        )
+
+    def _grid_graph(self, canvas, rows, columns, wrap=False):
+        vertices = self.add_vertices(self._grid_positions(canvas, rows, columns), canvas)
+        cells = np.arange(rows * columns).reshape(rows, columns)
+        if wrap:
+            right, down = np.roll(cells, -1, axis=1), np.roll(cells, -1, axis=0)
+            self.add_edges(vertices, np.tile(cells.ravel(), 2), np.concatenate((right.ravel(), down.ravel())))
+        else:
+            self.add_edges(
+                vertices, np.concatenate((cells[:, :-1].ravel(), cells[:-1, :].ravel())),
+                np.concatenate((cells[:, 1:].ravel(), cells[1:, :].ravel()))
+            )
+
+    def _torus_graph(self, canvas, rows, columns):
+        self._grid_graph(canvas, rows, columns, wrap=True)
+
+    def _circulant_graph(self, canvas, nodes, largest_jump, radius=100):
+        """Circulant graph C_n(1, ..., largest_jump)."""
+        vertices = self.add_vertices(self._circle_positions(canvas, nodes, radius), canvas)
+        indices = np.arange(nodes)
+        jumps = np.arange(1, largest_jump + 1)
+        self.add_edges(vertices, np.tile(indices, len(jumps)), ((indices[None, :] + jumps[:, None]) % nodes).ravel())
+
+    def _kneser_graph(self, canvas, n, k, radius=100):
+        subsets = list(combinations(range(n), k))
+        masks = {sum(1 << i for i in subset): index for index, subset in enumerate(subsets)}
+        vertices = self.add_vertices(self._circle_positions(canvas, len(subsets), radius), canvas)
+        sources, targets = [], []
+        for mask, index in masks.items():
+            rest = [i for i in range(n) if not mask >> i & 1]
+            for other in combinations(rest, k):
+                other_index = masks[sum(1 << i for i in other)]
+                if index < other_index:
+                    sources.append(index)
+                    targets.append(other_index)
+        self.add_edges(vertices, sources, targets)
+
+    def _random_pairs(self, nodes, edges, rng):
+        """`edges` distinct unordered vertex pairs, drawn uniformly."""
+        total = nodes * (nodes - 1) // 2
+        edges = min(edges, total)
+        chosen = np.empty(0, dtype=np.int64)
+        while len(chosen) < edges:
+            extra = rng.integers(0, total, size=edges - len(chosen), dtype=np.int64)
+            chosen = np.sort(np.concatenate((chosen, extra)))
+            # Sort and mask rather than np.unique, which hashes ints and is much slower here.
+            chosen = chosen[np.concatenate(([True], chosen[1:] != chosen[:-1]))]
+        chosen = rng.permutation(chosen)[:edges]
+        # Pair index k enumerates (i, j) with j < i as k = i * (i - 1) / 2 + j.
+        rows = ((np.sqrt(8 * chosen.astype(np.float64) + 1) + 1) // 2).astype(np.int64)
+        rows -= rows * (rows - 1) // 2 > chosen
+        rows += (rows + 1) * rows // 2 <= chosen
+        return rows, chosen - rows * (rows - 1) // 2
+
+    def _random_gnp_graph(self, canvas, nodes, percent, seed=None, radius=100):
+        rng = np.random.default_rng(seed)
+        edges = rng.binomial(nodes * (nodes - 1) // 2, percent / 100)
+        self._random_gnm_graph(canvas, nodes, edges, seed=rng, radius=radius)
+
+    def _random_gnm_graph(self, canvas, nodes, edges, seed=None, radius=100):
+        rng = np.random.default_rng(seed)
+        vertices = self.add_vertices(self._circle_positions(canvas, nodes, radius), canvas)
+        sources, targets = self._random_pairs(nodes, edges, rng)
+        self.add_edges(vertices, sources, targets)
 
 
     # Graph Functions
-    def line_graph(self):
-        old_edges = list(self.edges.items())
-        for vertex_id, neighbors in old_edges:
-            vertex = self.get_vertex_by_id(vertex_id)
-            for neighbor in neighbors:
-                neighbor = self.get_vertex_by_id(neighbor)
-                midpoint = ((vertex.x + neighbor.x)/2, (vertex.y + neighbor.y)/2)
-                add_vertex = Vertex(vertex.canvas, *midpoint, labels=[vertex.id, neighbor.id])
-                self.create_vertex(add_vertex)
-            self.remove_vertex(vertex)
-        for vertex in self.vertices:
-            neighbors = self.get_vertices_by_label(vertex.labels[0])
-            neighbors.extend(self.get_vertices_by_label(vertex.labels[1]))
-            for neighbor in neighbors:
-                try:
-                    self.create_edge(vertex, neighbor)
-                except ValueError:
-                    continue
-        self.remove_all_labels()
+    def line_graph(self, progress=None, csr=None, positions=None):
+        """
+            Line graph as a new Graph: one vertex per edge, placed at the edge's
+            midpoint, adjacent when the edges share an endpoint (or, when
+            directed, when one ends where the other starts). Loops are skipped.
+            `progress`, if given, is called with the fraction of edges added.
+            Off the thread that edits the graph, pass `csr` and `positions`
+            (snapshot() and positions()) read beforehand.
+        """
+        csr = self.snapshot() if csr is None else csr
+        endpoints = edge_endpoints(csr)
+        positions = self.positions() if positions is None else positions
+        midpoints = (positions[endpoints[:, 0]] + positions[endpoints[:, 1]]) / 2
+
+        line = Graph(f"L({self.name})", simple=self.simple, directed=self.directed)
+        vertices = line.add_vertices(midpoints)
+        total, added = max(line_graph_size(csr), 1), 0
+        for sources, targets in iter_line_graph_edges(csr, chunk_size=1 << 16):
+            line.add_edges(vertices, sources, targets)
+            added += len(sources)
+            if progress is not None:
+                progress(added / total)
+        return line
+
+    def positions(self):
+        """(x, y) of every vertex as an (n, 2) array, in `vertices` order."""
+        return np.array([(vertex.x, vertex.y) for vertex in self.vertex_index.values()], dtype=float).reshape(-1, 2)
+
+    def set_positions(self, positions):
+        """
+            Move every vertex to its row of `positions`, in `vertices` order.
+            Drawn vertices keep their old canvas items; redraw afterwards.
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if len(positions) != len(self.vertex_index):
+            raise ValueError(f"Expected {len(self.vertex_index)} positions, got {len(positions)}.")
+        vertices = self.vertices
+        for vertex, (x, y) in zip(vertices, positions.tolist()):
+            vertex.x, vertex.y = x, y
+        self.weights.move_all()
+        self.spatial_index.clear()
+        self.spatial_index.insert_many(vertices)
+
+    def spring_layout(self, canvas=None, iterations=None, seed=None, progress=None, csr=None):
+        """Force-directed positions for the whole graph, from a random start; see set_positions."""
+        width, height = canvas_size(canvas)
+        return fruchterman_reingold(
+            self.snapshot() if csr is None else csr,
+            iterations=iterations, width=width, height=height, seed=seed, progress=progress
+        )
+
+    def relax_layout(self, canvas=None, iterations=10, progress=None, csr=None, positions=None):
+        """
+            A few force-directed steps from the current positions, to tidy up
+            after edits. Like line_graph, takes `csr` and `positions` read
+            beforehand when run off the editing thread.
+        """
+        width, height = canvas_size(canvas)
+        csr = self.snapshot() if csr is None else csr
+        positions = self.positions() if positions is None else positions
+        return relax(csr, positions, iterations, width, height, progress)
     
     def label_by_bfs(self, vertex: Vertex, colorize=True):
         set_labels = self.bfs_algorithm(vertex)
@@ -348,34 +847,200 @@ class Graph:
 
 
     # Important Functions
+    @memoized
+    def snapshot(self) -> CSRGraph:
+        return CSRGraph.from_graph(self)
+
+    @memoized
+    def bfs_distances(self, start_vertex: Vertex):
+        """Hop distances from `start_vertex` as an array in `snapshot()` order; -1 if unreachable."""
+        if start_vertex.id not in self.edges:
+            raise ValueError("Vertex must be in the graph")
+        csr = self.snapshot()
+        return csr.bfs(csr.index[start_vertex.id])
+
     def bfs_algorithm(self, start_vertex: Vertex):
+        distances = self.bfs_distances(start_vertex)
+        inf = float('inf')
+        return {
+            vertex_id: distance if distance >= 0 else inf
+            for vertex_id, distance in zip(self.vertex_index, distances.tolist())
+        }
+
+    def bfs_steps(self, start_vertex: Vertex):
+        """Generator of BFS step events (see backend.traversal) for animation."""
+        if start_vertex.id not in self.edges:
+            raise ValueError("Vertex must be in the graph")
+        csr = self.snapshot()
+        return bfs_events(csr, csr.index[start_vertex.id])
+
+    def dfs_steps(self, start_vertex: Vertex):
         if start_vertex.id not in self.edges:
             raise ValueError("Vertex must be in the graph")
-        distances = {vertex.id: float('inf') for vertex in self.vertices}
-        distances[start_vertex.id] = 0
-        queue = deque([start_vertex.id])
-        while queue:
-            current_id = queue.popleft()
-            current_distance = distances[current_id]
-            for neighbor_id in self.edges[current_id]:
-                if distances[neighbor_id] == float('inf'):
-                    distances[neighbor_id] = current_distance + 1
-                    queue.append(neighbor_id)
-        return distances
+        csr = self.snapshot()
+        return dfs_events(csr, csr.index[start_vertex.id])
 
+    @memoized
     def distance_distribution(self, vertex: Vertex):
+        distances = self.bfs_distances(vertex)
+        return np.bincount(distances[distances >= 0])
+
+    @memoized
+    def distance_stats(self, processes=None, progress=None):
+        return all_sources_distances(self.snapshot(), processes=processes, progress=progress)
+
+    def all_distance_distribution(self, processes=None):
+        """Distance histogram summed over every source vertex."""
+        return self.distance_stats(processes=processes)['histogram']
+
+    def eccentricities(self, processes=None):
+        eccentricities = self.distance_stats(processes=processes)['eccentricities'].tolist()
+        inf = float('inf')
+        return {
+            vertex_id: eccentricity if eccentricity >= 0 else inf
+            for vertex_id, eccentricity in zip(self.vertex_index, eccentricities)
+        }
+
+    def diameter(self, processes=None):
+        return max(self.eccentricities(processes).values(), default=0)
+
+    def radius(self, processes=None):
+        return min(self.eccentricities(processes).values(), default=0)
+
+    def wiener_index(self, processes=None):
+        stats = self.distance_stats(processes=processes)
+        if (stats['eccentricities'] < 0).any():
+            return float('inf')
+        if self.directed:
+            return stats['distance_sum']
+        return stats['distance_sum'] // 2
+
+    @memoized
+    def girth(self):
+        return self.snapshot().girth()
+
+    @memoized
+    def is_bipartite(self):
+        return self.snapshot().is_bipartite()
+
+    # Weighted Paths
+    def edge_weights(self):
+        """Weight of every entry of `snapshot().indices`: explicit if set, else the edge's length."""
+        return self.weights.array(self.snapshot(), self.vertex_index)
+
+    def _search_tables(self):
+        return self.weights.tables(self.snapshot(), self.vertex_index)
+
+    def _vertex_index(self, vertex: Vertex):
         if vertex.id not in self.edges:
             raise ValueError("Vertex must be in the graph")
-        distance = []
-        distances = self.bfs_algorithm(vertex)
-        distance.extend(d for d in distances.values() if d < float('inf'))
-        if distance:
-            max_distance = max(distance)
-            distance_histogram, bins = np.histogram(distance, bins=range(max_distance + 2))
+        return self.snapshot().index[vertex.id]
+
+    def dijkstra(self, sources, target: Vertex = None):
+        """
+            Weighted distances from a vertex, or from the nearest of several,
+            as (distances, predecessors) arrays in `vertices` order. With a
+            `target` the search stops once its distance is final.
+        """
+        if isinstance(sources, Vertex):
+            sources = [sources]
+        source_indices = [self._vertex_index(vertex) for vertex in sources]
+        target_index = None if target is None else self._vertex_index(target)
+        adjacency, _, _ = self._search_tables()
+        return dijkstra(adjacency, source_indices, target_index)
+
+    def astar(self, source: Vertex, target: Vertex):
+        adjacency, coordinates, scale = self._search_tables()
+        return astar(
+            adjacency, coordinates, self._vertex_index(source), self._vertex_index(target), scale
+        )
+
+    def shortest_path(self, source: Vertex, target: Vertex, method='astar'):
+        """(length, [Vertex, ...]) of a lightest path, or (inf, []) if `target` can't be reached."""
+        if method == 'astar':
+            distances, predecessors = self.astar(source, target)
+        elif method == 'dijkstra':
+            distances, predecessors = self.dijkstra(source, target)
         else:
-            distance_histogram = np.array([])
-            bins = np.array([])
-        return distance_histogram
+            raise ValueError(f"Unknown shortest path method '{method}'.")
+        target_index = self._vertex_index(target)
+        if distances[target_index] == np.inf:
+            return float('inf'), []
+        ids = self.snapshot().ids
+        return float(distances[target_index]), [self.vertex_index[ids[i]] for i in path_to(predecessors, target_index)]
+
+    # Colouring
+    @memoized
+    def vertex_coloring(self, method='dsatur', progress=None):
+        """
+            Proper colour index per vertex, in `vertices` order; method is
+            'greedy', 'dsatur' or 'exact'. Only 'exact' reports `progress`.
+        """
+        csr = self.snapshot()
+        if method == 'greedy':
+            return greedy_coloring(csr)
+        if method == 'dsatur':
+            return dsatur_coloring(csr)
+        if method == 'exact':
+            return exact_coloring(csr, progress=progress)[1]
+        raise ValueError(f"Unknown colouring method '{method}'.")
+
+    def chromatic_number(self):
+        colors = self.vertex_coloring('exact')
+        return int(colors.max()) + 1 if len(colors) else 0
+
+    @memoized
+    def edge_coloring(self, exact=False, progress=None):
+        """
+            Colour index per edge as {(id1, id2): colour}, with Misra-Gries
+            (at most max degree + 1 colours) or, if `exact`, an optimal one.
+        """
+        csr = self.snapshot()
+        colors = chromatic_index(csr, progress)[1] if exact else misra_gries_edge_coloring(csr)
+        ids = csr.ids
+        return {(ids[u], ids[v]): color for (u, v), color in zip(edge_endpoints(csr).tolist(), colors.tolist())}
+
+    def chromatic_index(self):
+        colors = self.edge_coloring(exact=True)
+        return max(colors.values()) + 1 if colors else 0
+
+    def apply_coloring(self, colors):
+        """Replace every vertex's labels with its colour, as a colour name while there are enough."""
+        for vertex, color in zip(self.vertex_index.values(), np.asarray(colors).tolist()):
+            vertex.add_label(int_to_color(color) if color < 10 else color)
+
+    def color_vertices(self, method='dsatur'):
+        colors = self.vertex_coloring(method)
+        self.apply_coloring(colors)
+        return int(colors.max()) + 1 if len(colors) else 0
+
+    def edge_colored_line_graph(self, exact=False):
+        """The line graph, its vertices labelled with the colours of the edges they stand for."""
+        line = self.line_graph()
+        colors = self.edge_coloring(exact)
+        line.apply_coloring(list(colors.values()))
+        return line
+
+    def coloring_conflicts(self):
+        """
+            Pairs of adjacent vertices whose first labels are equal, checked in
+            one pass over the snapshot. Unlabelled vertices never conflict.
+        """
+        codes = {}
+        colors = np.array([
+            codes.setdefault(vertex.labels[0], len(codes)) if vertex.labels else -1
+            for vertex in self.vertex_index.values()
+        ], dtype=np.int64)
+        csr = self.snapshot()
+        vertices = self.vertices
+        return [(vertices[u], vertices[v]) for u, v in coloring_conflicts(csr, colors).tolist()]
+
+    def connected_components(self):
+        labels = self.snapshot().connected_components()
+        components = [[] for _ in range(int(labels.max()) + 1)] if len(labels) else []
+        for vertex, label in zip(self.vertex_index.values(), labels.tolist()):
+            components[label].append(vertex)
+        return components
 
 
 class GraphIsomorphism:
@@ -383,24 +1048,21 @@ class GraphIsomorphism:
         self.name = name
         self.description = description
         self.edges = {}
+        self.csr = None
 
     def create_from_graph(self, graph: Graph):
         for vertex, neighbors in graph.edges.items():
             self.edges[vertex] = neighbors
+        self.csr = graph.snapshot()
         self.name = graph.name
     
     def check_isomorphism(self, graph: Graph):
-        degrees = sorted([len(details.neighbors) for details in graph.edges.values()])
-        iso_degrees = sorted([len(neighbors) for neighbors in self.edges.values()])
-        if degrees != iso_degrees:
+        """
+            Returns a mapping from this graph's vertex ids to `graph`'s vertex
+            ids if the two are isomorphic, otherwise False.
+        """
+        other = graph.snapshot()
+        mapping = find_isomorphism(self.csr, other)
+        if mapping is None:
             return False
-        
-        vertices = self.edges.keys()
-        for perm in permutations(graph.edges.keys()):
-            mapping = dict(zip(vertices, perm))
-            if all(
-                set(self.edges[v1]) == set(mapping[v2] for v2 in graph.edges[mapping[v1]].neighbors)
-                for v1 in vertices
-            ):
-                return True
-        return False
\ No newline at end of file
+        return {self.csr.ids[i]: other.ids[j] for i, j in enumerate(mapping)}
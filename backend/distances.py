@@ -0,0 +1,113 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+
+import numpy as np
+
+from .csr import bfs_levels
+
+
+# Small graphs finish faster serially than it takes to start a pool.
+PARALLEL_THRESHOLD = 2000
+
+_worker_arrays = {}
+
+
+def _share(array):
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+    return block
+
+
+def _attach_worker(indptr_spec, indices_spec):
+    for key, (name, length, dtype) in (('indptr', indptr_spec), ('indices', indices_spec)):
+        block = shared_memory.SharedMemory(name=name)
+        _worker_arrays[key] = np.ndarray((length,), dtype=dtype, buffer=block.buf)
+        _worker_arrays[key + '_block'] = block
+
+
+def _worker_sources(sources):
+    return _sources_stats(_worker_arrays['indptr'], _worker_arrays['indices'], sources)
+
+
+def _sources_stats(indptr, indices, sources):
+    """BFS from each source; returns (sources, eccentricities, histogram, distance sum)."""
+    n = len(indptr) - 1
+    eccentricities = np.empty(len(sources), dtype=np.int64)
+    histogram = np.zeros(1, dtype=np.int64)
+    total = 0
+    for i, source in enumerate(sources):
+        distances = bfs_levels(indptr, indices, source)
+        reached = distances[distances >= 0]
+        counts = np.bincount(reached)
+        if len(counts) > len(histogram):
+            counts[:len(histogram)] += histogram
+            histogram = counts
+        else:
+            histogram[:len(counts)] += counts
+        total += int(reached.sum())
+        eccentricities[i] = reached.max() if len(reached) == n else -1
+    return sources, eccentricities, histogram, total
+
+
+def _merge_histograms(histograms):
+    merged = np.zeros(max(len(h) for h in histograms), dtype=np.int64)
+    for histogram in histograms:
+        merged[:len(histogram)] += histogram
+    return merged
+
+
+def all_sources_distances(csr, processes=None, chunks_per_process=4, progress=None):
+    """
+        Run a BFS from every vertex of a CSRGraph and aggregate the results.
+
+        Sources are split across a process pool that reads the adjacency from
+        shared memory. Returns a dict with the summed distance `histogram`
+        over ordered pairs, per-vertex `eccentricities` (-1 when some vertex is
+        unreachable) and `distance_sum`, the sum of all finite distances.
+        `progress` gets the fraction of sources done after each chunk.
+    """
+    n = csr.num_vertices
+    if n == 0:
+        return {
+            'histogram': np.zeros(0, dtype=np.int64),
+            'eccentricities': np.zeros(0, dtype=np.int64),
+            'distance_sum': 0,
+        }
+    processes = processes or os.cpu_count() or 1
+    sources = np.arange(n)
+
+    results = []
+    if processes == 1 or n < PARALLEL_THRESHOLD:
+        chunks = np.array_split(sources, min(n, 32) if progress is not None else 1)
+        for chunk in chunks:
+            if progress is not None:
+                progress(len(results) / len(chunks))
+            results.append(_sources_stats(csr.indptr, csr.indices, chunk))
+        if progress is not None:
+            progress(1.0)
+    else:
+        blocks = [_share(csr.indptr), _share(csr.indices)]
+        specs = [(block.name, len(array), array.dtype.str) for block, array in zip(blocks, (csr.indptr, csr.indices))]
+        chunks = np.array_split(sources, processes * chunks_per_process)
+        pool = ProcessPoolExecutor(processes, initializer=_attach_worker, initargs=specs)
+        try:
+            for result in pool.map(_worker_sources, chunks):
+                results.append(result)
+                if progress is not None:
+                    progress(len(results) / len(chunks))
+        finally:
+            # On cancellation, drop the chunks no worker has started.
+            pool.shutdown(cancel_futures=True)
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    eccentricities = np.empty(n, dtype=np.int64)
+    for chunk, chunk_eccentricities, _, _ in results:
+        eccentricities[chunk] = chunk_eccentricities
+    return {
+        'histogram': _merge_histograms([histogram for _, _, histogram, _ in results]),
+        'eccentricities': eccentricities,
+        'distance_sum': sum(total for _, _, _, total in results),
+    }
@@ -1,31 +1,111 @@
-from .definitions import Vertex, Graph
+import numpy as np
 
-def cartesian_product(canvas, graph1: Graph, graph2: Graph):
-    new_graph = Graph(f"Cartesian: {graph1.name} x {graph2.name}")
-    vertices1 = graph1.vertices
-    vertices2 = graph2.vertices
-    cartesian_vertices = [
-        Vertex(canvas, (u.x + v.x)/2, (u.y + v.y)/2, labels=[u.id, v.id]) 
-        for u in vertices1 for v in vertices2
-    ]
-    for vertex in cartesian_vertices:
-        new_graph.create_vertex(vertex)
-
-    for u in vertices1:
-        vertices = new_graph.get_vertices_by_label(u.id)
-        edges = graph1.edges
-        for vertex in vertices:
-            for neighbor in edges[vertex.id]:
-                new_graph.create_edge(neighbor, vertex)
-    for u in vertices2:
-        vertices = new_graph.get_vertices_by_label(u.id)
-        edges = graph2.edges
-        for vertex in vertices:
-            for neighbor in edges[vertex.id]:
-                new_graph.create_edge(neighbor, vertex)
-
-    new_graph.remove_all_labels()
+from .csr import CSRGraph
+from .definitions import Graph, canvas_size
+
+PRODUCTS = ('cartesian', 'tensor', 'strong', 'lexicographic')
+
+
+def _arcs(csr, once):
+    """Adjacency entries as (sources, targets); `once` keeps one direction of undirected edges."""
+    sources = csr.sources().astype(np.int64)
+    targets = csr.indices.astype(np.int64)
+    if once and not csr.directed:
+        keep = sources < targets
+        return sources[keep], targets[keep]
+    return sources, targets
+
+
+def _kron(arcs1, arcs2, size2):
+    """Sparse Kronecker product of two edge lists: ((a1, b1), (a2, b2)) for every pair of arcs."""
+    (s1, t1), (s2, t2) = arcs1, arcs2
+    count2 = len(s2)
+    sources = np.repeat(s1, count2) * size2 + np.tile(s2, len(s1))
+    targets = np.repeat(t1, count2) * size2 + np.tile(t2, len(s1))
+    return sources, targets
+
+
+def _identity(size):
+    vertices = np.arange(size, dtype=np.int64)
+    return vertices, vertices
+
+
+def _all_pairs(size):
+    sources, targets = np.divmod(np.arange(size * size, dtype=np.int64), size)
+    return sources, targets
+
+
+def product_edges(csr1, csr2, kind='cartesian'):
+    """
+        Edges of a graph product over vertices (a, b) numbered a * n2 + b, built
+        from the factors' adjacency with Kronecker-style array operations:
+            cartesian       A (x) I + I (x) B
+            tensor          A (x) B
+            strong          cartesian + tensor
+            lexicographic   A (x) J + I (x) B
+        Undirected products list every edge once.
+    """
+    if kind not in PRODUCTS:
+        raise ValueError(f"Unknown product '{kind}', expected one of {PRODUCTS}.")
+    n1, n2 = csr1.num_vertices, csr2.num_vertices
+    directed = csr1.directed or csr2.directed
+    once = not directed
+    pieces = []
+    if kind in ('cartesian', 'strong'):
+        pieces.append(_kron(_arcs(csr1, once), _identity(n2), n2))
+    if kind in ('cartesian', 'strong', 'lexicographic'):
+        pieces.append(_kron(_identity(n1), _arcs(csr2, once), n2))
+    if kind in ('tensor', 'strong'):
+        # One direction of the first factor against both directions of the second
+        # still yields each undirected edge exactly once.
+        pieces.append(_kron(_arcs(csr1, once), _arcs(csr2, False), n2))
+    if kind == 'lexicographic':
+        pieces.append(_kron(_arcs(csr1, once), _all_pairs(n2), n2))
+    sources = np.concatenate([s for s, _ in pieces])
+    targets = np.concatenate([t for _, t in pieces])
+    return n1 * n2, sources, targets, directed
+
+
+def product_csr(csr1, csr2, kind='cartesian'):
+    size, sources, targets, directed = product_edges(csr1, csr2, kind)
+    ids = [f"{a}:{b}" for a in csr1.ids for b in csr2.ids]
+    return CSRGraph.from_edges(size, sources, targets, ids=ids, directed=directed)
+
+
+def _normalized(positions):
+    if len(positions) == 0:
+        return positions
+    centered = positions - positions.mean(axis=0)
+    extent = np.abs(centered).max()
+    return centered / extent if extent > 0 else centered
+
+
+def product_layout(graph1: Graph, graph2: Graph, canvas=None, inner_scale=0.25):
+    """Positions of (a, b): a copy of graph2's layout, shrunk, placed at a's position."""
+    width, height = canvas_size(canvas)
+    outer = 0.4 * min(width, height)
+    layout1 = _normalized(graph1.positions()) * outer
+    layout2 = _normalized(graph2.positions()) * outer * inner_scale
+    positions = layout1[:, None, :] + layout2[None, :, :]
+    return positions.reshape(-1, 2) + (width / 2, height / 2)
+
+
+def graph_product(graph1: Graph, graph2: Graph, kind='cartesian', canvas=None):
+    _, sources, targets, directed = product_edges(graph1.snapshot(), graph2.snapshot(), kind)
+    new_graph = Graph(f"{kind.capitalize()}: {graph1.name} x {graph2.name}", directed=directed)
+    vertices = new_graph.add_vertices(product_layout(graph1, graph2, canvas), canvas)
+    new_graph.add_edges(vertices, sources, targets)
     return new_graph
 
-def tensor_product(graph1: Graph, graph2: Graph):
-    pass
+
+def cartesian_product(canvas, graph1: Graph, graph2: Graph):
+    return graph_product(graph1, graph2, 'cartesian', canvas)
+
+def tensor_product(graph1: Graph, graph2: Graph, canvas=None):
+    return graph_product(graph1, graph2, 'tensor', canvas)
+
+def strong_product(graph1: Graph, graph2: Graph, canvas=None):
+    return graph_product(graph1, graph2, 'strong', canvas)
+
+def lexicographic_product(graph1: Graph, graph2: Graph, canvas=None):
+    return graph_product(graph1, graph2, 'lexicographic', canvas)
@@ -0,0 +1,332 @@
+import gzip
+import os
+import warnings
+
+import numpy as np
+
+from .csr import CSRGraph
+
+# Text read per chunk; memory use is a few times this plus the parsed edges.
+CHUNK_BYTES = 1 << 24
+FORMATS = ('snap', 'mtx', 'dimacs')
+EXTENSIONS = {'.mtx': 'mtx', '.gr': 'dimacs', '.col': 'dimacs', '.dimacs': 'dimacs'}
+COMMENTS = {'snap': b'#', 'mtx': b'%', 'dimacs': b'c'}
+
+
+def detect_format(path):
+    """Format from the file extension (ignoring .gz); anything unknown is a SNAP edge list."""
+    base = path[:-len('.gz')] if path.endswith('.gz') else path
+    return EXTENSIONS.get(os.path.splitext(base)[1].lower(), 'snap')
+
+
+def edge_list_name(path):
+    """'web-Google.txt.gz' -> 'web-Google'."""
+    return os.path.basename(path).split('.')[0]
+
+
+class EdgeListReader:
+    """
+        Streams the edges of a SNAP, Matrix Market or DIMACS file in chunks of
+        about `chunk_bytes` of text, optionally gzipped. Whole chunks are
+        parsed by numpy at once; only lines it can't read (vertex names that
+        aren't numbers, stray comments) go through Python line by line.
+            snap:   'u v [weight]' per line, '#' comments. Names can be any token.
+            mtx:    coordinate matrices; symmetric ones are undirected graphs.
+            dimacs: 'p edge n m' with 'e u v' lines, or 'p sp n m' with 'a u v w' arcs.
+        `directed`, `weighted` and (for mtx and dimacs) `num_vertices` are
+        known once the first chunk has been read.
+    """
+    def __init__(self, path, fmt=None, chunk_bytes=CHUNK_BYTES):
+        self.path = path
+        self.format = fmt or detect_format(path)
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown edge list format '{self.format}'.")
+        self.chunk_bytes = chunk_bytes
+        self.comment = COMMENTS[self.format]
+        self.directed = False
+        self.weighted = False
+        self.num_vertices = None
+        self.columns = None
+        self.in_header = True
+        self.size_line = self.format == 'mtx'
+
+    def chunks(self, progress=None):
+        """Yields (heads, tails, weights) per chunk; names are int64 arrays, or bytes arrays when not numeric."""
+        total = max(os.path.getsize(self.path), 1)
+        with open(self.path, 'rb') as raw:
+            stream = gzip.GzipFile(fileobj=raw) if self.path.endswith('.gz') else raw
+            rest = b''
+            while True:
+                if progress is not None:
+                    progress(raw.tell() / total)
+                block = stream.read(self.chunk_bytes)
+                text = rest + block
+                if not block:
+                    rest = b''
+                elif b'\n' in block:
+                    cut = text.rindex(b'\n') + 1
+                    text, rest = text[:cut], text[cut:]
+                else:
+                    rest, text = text, b''
+                if self.in_header:
+                    text = self._read_header(text, final=not block)
+                if text.strip():
+                    yield self._parse(text)
+                if not block:
+                    break
+
+    def _read_header(self, text, final):
+        """Take header and comment lines off the front of `text`, up to the first edge."""
+        start = 0
+        while start < len(text):
+            end = text.find(b'\n', start)
+            end = len(text) if end < 0 else end + 1
+            line = text[start:end].strip()
+            if line and not self._header_line(line):
+                self.in_header = False
+                self.columns = len(self._normalize(line).split())
+                if self.columns < 2:
+                    raise ValueError(f"Malformed edge line: {line.decode(errors='replace')}")
+                if self.format == 'snap':
+                    self.weighted = self.columns > 2
+                return text[start:]
+            start = end
+        if final and self.format != 'snap' and self.num_vertices is None:
+            raise ValueError(f"{self.path} has no {self.format} header.")
+        return b''
+
+    def _header_line(self, line):
+        if self.format == 'mtx':
+            if line.startswith(b'%%MatrixMarket'):
+                banner = line.lower().split()
+                if banner[2:3] != [b'coordinate']:
+                    raise ValueError("Only coordinate Matrix Market files describe graphs.")
+                if banner[3:4] == [b'complex']:
+                    raise ValueError("Complex matrices can't be read as edge weights.")
+                self.weighted = banner[3:4] != [b'pattern']
+                self.directed = banner[4:5] == [b'general']
+                return True
+            if line.startswith(self.comment):
+                return True
+            if self.size_line:
+                rows, columns = line.split()[:2]
+                if rows != columns:
+                    raise ValueError("Only square matrices are adjacency matrices.")
+                self.num_vertices = int(rows)
+                self.size_line = False
+                return True
+            return False
+        if self.format == 'dimacs':
+            if line.startswith(b'p'):
+                kind, n = line.split()[1:3]
+                self.directed = kind == b'sp'
+                self.weighted = kind == b'sp'
+                self.num_vertices = int(n)
+                return True
+            return line.startswith(self.comment)
+        if line.startswith(self.comment):
+            # SNAP headers say '# Directed graph ...' or '# Undirected graph ...'.
+            words = line.lower().split()
+            if b'directed' in words:
+                self.directed = True
+            return True
+        return False
+
+    def _normalize(self, text):
+        if self.format == 'dimacs':
+            return text.translate(None, b'ae')
+        if self.format == 'snap':
+            return text.replace(b',', b' ')
+        return text
+
+    def _parse(self, text):
+        columns = self.columns
+        if text.startswith(self.comment) or (b'\n' + self.comment) in text:
+            text = b'\n'.join(line for line in text.split(b'\n') if not line.startswith(self.comment)) + b'\n'
+        text = self._normalize(text)
+        values = None
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', DeprecationWarning)
+                values = np.fromstring(text, dtype=np.float64 if columns > 2 else np.int64, sep=' ')
+        except (ValueError, DeprecationWarning):
+            pass
+        lines = text.count(b'\n') + (not text.endswith(b'\n'))
+        if values is None or len(values) != lines * columns:
+            return self._parse_lines(text)
+        values = values.reshape(-1, columns)
+        weights = values[:, 2] if self.weighted else None
+        return values[:, 0].astype(np.int64), values[:, 1].astype(np.int64), weights
+
+    def _parse_lines(self, text):
+        """Slower path for chunks numpy can't read as one block of numbers."""
+        tokens = text.split()
+        if len(tokens) == (text.count(b'\n') + (not text.endswith(b'\n'))) * self.columns:
+            tokens = np.array(tokens, dtype=bytes).reshape(-1, self.columns)[:, :3 if self.weighted else 2]
+        else:
+            rows = []
+            for line in text.split(b'\n'):
+                tokens = line.split()
+                if not tokens:
+                    continue
+                if len(tokens) < (3 if self.weighted else 2):
+                    raise ValueError(f"Malformed edge line: {line.decode(errors='replace')}")
+                rows.append(tokens[:3] if self.weighted else tokens[:2])
+            tokens = np.array(rows, dtype=bytes).reshape(-1, 3 if self.weighted else 2)
+        weights = tokens[:, 2].astype(np.float64) if self.weighted else None
+        heads, tails = tokens[:, 0], tokens[:, 1]
+        try:
+            return heads.astype(np.int64), tails.astype(np.int64), weights
+        except ValueError:
+            if self.format != 'snap':
+                raise ValueError(f"{self.format} vertices are numbered 1 to n.")
+            return heads, tails, weights
+
+
+class _Renumbering:
+    """
+        Maps vertex names to 0..n-1 as chunks arrive. Numeric names are kept
+        as they are until the end and then renumbered in one vectorized pass;
+        once a non-numeric name shows up, every name goes through a dict, one
+        lookup per distinct name per chunk.
+    """
+    def __init__(self):
+        self.chunks = []
+        self.names = None
+
+    def add(self, heads, tails):
+        if self.names is None and heads.dtype.kind == 'i' and tails.dtype.kind == 'i':
+            self.chunks.append((heads, tails))
+            return
+        if self.names is None:
+            numeric, self.chunks = self.chunks, []
+            self.names = {}
+            for old_heads, old_tails in numeric:
+                self._add_named(old_heads.astype(bytes), old_tails.astype(bytes))
+        self._add_named(heads.astype(bytes), tails.astype(bytes))
+
+    def _add_named(self, heads, tails):
+        unique, inverse = np.unique(np.concatenate((heads, tails)), return_inverse=True)
+        names = self.names
+        codes = np.array([names.setdefault(name, len(names)) for name in unique.tolist()], dtype=np.int64)
+        codes = codes[inverse.ravel()]
+        self.chunks.append((codes[:len(heads)], codes[len(heads):]))
+
+    def finish(self):
+        """Returns (ids, heads, tails), ids being the names as strings."""
+        heads = np.concatenate([chunk[0] for chunk in self.chunks]) if self.chunks else np.zeros(0, dtype=np.int64)
+        tails = np.concatenate([chunk[1] for chunk in self.chunks]) if self.chunks else np.zeros(0, dtype=np.int64)
+        self.chunks = []
+        if self.names is not None:
+            return [name.decode() for name in self.names], heads, tails
+        if not len(heads):
+            return [], heads, tails
+        low, high = int(min(heads.min(), tails.min())), int(max(heads.max(), tails.max()))
+        if high - low <= 4 * len(heads):
+            # Dense enough for a lookup table: vertices come out sorted by name.
+            present = np.zeros(high - low + 1, dtype=bool)
+            present[heads - low] = True
+            present[tails - low] = True
+            code = np.cumsum(present) - 1
+            names = np.flatnonzero(present) + low
+            heads, tails = code[heads - low], code[tails - low]
+        else:
+            names = np.sort(np.concatenate((heads, tails)))
+            names = names[np.concatenate(([True], names[1:] != names[:-1]))]
+            heads, tails = np.searchsorted(names, heads), np.searchsorted(names, tails)
+        return [str(name) for name in names.tolist()], heads, tails
+
+
+def read_edge_list(path, fmt=None, simple=True, progress=None, chunk_bytes=CHUNK_BYTES):
+    """
+        Read a whole edge list with bounded buffering. Returns
+        (ids, heads, tails, weights, directed): vertex names as strings, edge
+        endpoints as int arrays indexing `ids`, a float array of weights or
+        None, and whether the file describes a directed graph. Matrix Market
+        and DIMACS keep their 1..n numbering, isolated vertices included;
+        SNAP names are numbered in order, or in order of appearance if any
+        isn't a number. With `simple`, loops and repeated edges are dropped,
+        and so is one arc of each opposite pair in a directed graph.
+    """
+    reader = EdgeListReader(path, fmt, chunk_bytes)
+    renumbering = _Renumbering()
+    numbered, weight_chunks = [], []
+    for heads, tails, weights in reader.chunks(progress):
+        if reader.format == 'snap':
+            renumbering.add(heads, tails)
+        else:
+            numbered.append((heads - 1, tails - 1))
+        if weights is not None:
+            weight_chunks.append(weights)
+    if reader.format == 'snap':
+        ids, heads, tails = renumbering.finish()
+    else:
+        ids = [str(i) for i in range(1, reader.num_vertices + 1)]
+        heads = np.concatenate([chunk[0] for chunk in numbered] + [np.zeros(0, dtype=np.int64)])
+        tails = np.concatenate([chunk[1] for chunk in numbered] + [np.zeros(0, dtype=np.int64)])
+        if len(heads) and (min(heads.min(), tails.min()) < 0 or max(heads.max(), tails.max()) >= len(ids)):
+            raise ValueError(f"Edge endpoints must be between 1 and {len(ids)}.")
+    weights = np.concatenate(weight_chunks + [np.zeros(0)]) if reader.weighted else None
+    if simple:
+        heads, tails, weights = _simplify(len(ids), heads, tails, weights, reader.directed)
+    return ids, heads, tails, weights, reader.directed
+
+
+def _simplify(n, heads, tails, weights, directed):
+    """
+        Drop loops and repeated edges, sorting edges by endpoints; a repeat
+        keeps one of its weights. As in Graph.create_edge, a simple directed
+        graph joins two vertices once either way round, so of two opposite
+        arcs only the one leaving the vertex listed first is kept.
+    """
+    loops = heads == tails
+    if loops.any():
+        heads, tails = heads[~loops], tails[~loops]
+        weights = None if weights is None else weights[~loops]
+    if not directed:
+        heads, tails = np.minimum(heads, tails), np.maximum(heads, tails)
+    keys = heads * n + tails
+    # A plain sort of the packed pairs is several times faster than argsort
+    # (and than np.unique, which hashes).
+    order = None
+    if weights is None:
+        keys.sort()
+    else:
+        order = np.argsort(keys)
+        keys = keys[order]
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = keys[1:] != keys[:-1]
+    keys = keys[first]
+    weights = None if order is None else weights[order[first]]
+    heads, tails = keys // n, keys % n
+    if directed and len(keys):
+        reverse = tails * n + heads
+        found = np.minimum(np.searchsorted(keys, reverse), len(keys) - 1)
+        keep = (keys[found] != reverse) | (heads < tails)
+        heads, tails = heads[keep], tails[keep]
+        weights = None if weights is None else weights[keep]
+    return heads, tails, weights
+
+
+def edge_csr(ids, heads, tails, directed=False):
+    """
+        CSRGraph.from_edges for big edge lists: sorts packed (source, target)
+        pairs instead of a stable argsort of the sources, so rows come out
+        sorted and it takes a fraction of the time.
+    """
+    n = len(ids)
+    heads, tails = np.asarray(heads, dtype=np.int64), np.asarray(tails, dtype=np.int64)
+    if not directed:
+        heads, tails = np.concatenate((heads, tails)), np.concatenate((tails, heads))
+    keys = heads * n + tails
+    del heads, tails
+    keys.sort()
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys // n, minlength=n), out=indptr[1:])
+    return CSRGraph(ids, indptr, keys % n, directed=directed)
+
+
+def read_csr(path, fmt=None, simple=True, progress=None, chunk_bytes=CHUNK_BYTES):
+    """An edge list straight into a CSRGraph, for analysis without building a Graph. Weights are dropped."""
+    ids, heads, tails, _, directed = read_edge_list(path, fmt, simple, progress, chunk_bytes)
+    return edge_csr(ids, heads, tails, directed)
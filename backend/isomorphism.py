@@ -0,0 +1,190 @@
+import hashlib
+from collections import Counter
+
+
+def adjacency_lists(csr):
+    """Per-vertex (out-neighbors, in-neighbors) lists of a CSRGraph."""
+    indptr = csr.indptr.tolist()
+    indices = csr.indices.tolist()
+    out_lists = [indices[indptr[i]:indptr[i + 1]] for i in range(csr.num_vertices)]
+    if not csr.directed:
+        return out_lists, out_lists
+    in_lists = [[] for _ in range(csr.num_vertices)]
+    for source, targets in enumerate(out_lists):
+        for target in targets:
+            in_lists[target].append(source)
+    return out_lists, in_lists
+
+
+def refine(out_lists, in_lists, colors):
+    """
+        Weisfeiler-Lehman colour refinement to the coarsest stable partition.
+        Colours are renumbered from their signatures only, so the result does
+        not depend on vertex order.
+    """
+    directed = out_lists is not in_lists
+    count = len(set(colors))
+    while True:
+        if directed:
+            signatures = [
+                (colors[v], tuple(sorted(colors[u] for u in out_lists[v])), tuple(sorted(colors[u] for u in in_lists[v])))
+                for v in range(len(colors))
+            ]
+        else:
+            signatures = [
+                (colors[v], tuple(sorted(colors[u] for u in out_lists[v])))
+                for v in range(len(colors))
+            ]
+        palette = {signature: i for i, signature in enumerate(sorted(set(signatures)))}
+        colors = [palette[signature] for signature in signatures]
+        if len(palette) == count:
+            return colors
+        count = len(palette)
+
+
+def _disjoint_union(first, second):
+    offset = len(first[0])
+    shifted = [[[u + offset for u in neighbors] for neighbors in lists] for lists in second]
+    out_lists = first[0] + shifted[0]
+    if first[0] is first[1]:
+        return out_lists, out_lists
+    return out_lists, first[1] + shifted[1]
+
+
+def _twin_classes(out_lists, in_lists):
+    """
+        Group vertices with identical neighbourhoods: open twins (same
+        neighbours) and, among the rest, closed twins (same neighbours once
+        each vertex counts itself). Any permutation inside a class is an
+        automorphism, so a class needs no more than one individualization.
+    """
+    directed = out_lists is not in_lists
+    n = len(out_lists)
+
+    def group(keys, vertices):
+        classes = {}
+        for v in vertices:
+            classes.setdefault(keys(v), []).append(v)
+        return list(classes.values())
+
+    def open_key(v):
+        key = tuple(sorted(out_lists[v]))
+        return (key, tuple(sorted(in_lists[v]))) if directed else key
+
+    def closed_key(v):
+        key = tuple(sorted(out_lists[v] + [v]))
+        return (key, tuple(sorted(in_lists[v] + [v]))) if directed else key
+
+    classes, singles = [], []
+    for members in group(open_key, range(n)):
+        if len(members) > 1:
+            classes.append(('open', members))
+        else:
+            singles.extend(members)
+    classes.extend(('closed', members) for members in group(closed_key, singles))
+    return classes
+
+
+def _quotient(out_lists, in_lists):
+    """
+        Collapse twin classes to single vertices. Returns the class members,
+        the quotient (out, in) lists and a descriptor per class that pins down
+        the edges inside it: kind, size, loops and multiplicity between members.
+    """
+    classes = _twin_classes(out_lists, in_lists)
+    owner = [0] * len(out_lists)
+    for c, (_, members) in enumerate(classes):
+        for v in members:
+            owner[v] = c
+
+    def project(lists):
+        projected = []
+        for c, (_, members) in enumerate(classes):
+            projected.append([owner[u] for u in lists[members[0]] if owner[u] != c])
+        return projected
+
+    descriptors = []
+    for kind, members in classes:
+        neighbors = Counter(out_lists[members[0]])
+        inner = neighbors[members[1]] if len(members) > 1 else 0
+        descriptors.append((kind, len(members), neighbors[members[0]], inner))
+    quotient_out = project(out_lists)
+    quotient_in = quotient_out if out_lists is in_lists else project(in_lists)
+    return [members for _, members in classes], (quotient_out, quotient_in), descriptors
+
+
+def _branches(colors, v, size):
+    fresh = max(colors) + 1
+    for w in range(size, 2 * size):
+        if colors[w] == colors[v]:
+            trial = list(colors)
+            trial[v] = trial[w] = fresh
+            yield trial
+
+
+def _search(out_lists, in_lists, colors, size):
+    """Individualization-refinement backtracking, with an explicit stack of pending branches."""
+    stack = [iter([colors])]
+    while stack:
+        colors = next(stack[-1], None)
+        if colors is None:
+            stack.pop()
+            continue
+        colors = refine(out_lists, in_lists, colors)
+        if Counter(colors[:size]) != Counter(colors[size:]):
+            continue
+
+        cells = {}
+        for v in range(size):
+            cells.setdefault(colors[v], []).append(v)
+        target = min((cell for cell in cells.values() if len(cell) > 1), key=len, default=None)
+        if target is None:
+            image = {colors[w]: w - size for w in range(size, 2 * size)}
+            return [image[colors[v]] for v in range(size)]
+        stack.append(_branches(colors, target[0], size))
+    return None
+
+
+def find_isomorphism(csr1, csr2):
+    """
+        Isomorphism from csr1 onto csr2 as a list (vertex i -> mapping[i]), or
+        None. Twins are collapsed first, then colour refinement rejects most
+        non-isomorphic pairs outright; the rest is individualization-refinement
+        backtracking, which only branches inside the smallest non-singleton
+        cell of the refined partition.
+    """
+    if csr1.num_vertices != csr2.num_vertices or len(csr1.indices) != len(csr2.indices):
+        return None
+    if csr1.directed != csr2.directed:
+        return None
+    size = csr1.num_vertices
+    first, second = adjacency_lists(csr1), adjacency_lists(csr2)
+    members1, quotient1, descriptors1 = _quotient(*first)
+    members2, quotient2, descriptors2 = _quotient(*second)
+    if len(members1) != len(members2):
+        return None
+    palette = {descriptor: i for i, descriptor in enumerate(sorted(set(descriptors1 + descriptors2)))}
+    out_lists, in_lists = _disjoint_union(quotient1, quotient2)
+    colors = [palette[descriptor] for descriptor in descriptors1 + descriptors2]
+    classes = _search(out_lists, in_lists, colors, len(members1))
+    if classes is None:
+        return None
+    mapping = [0] * size
+    for c, image in enumerate(classes):
+        for v, w in zip(members1[c], members2[image]):
+            mapping[v] = w
+    for v in range(size):
+        if sorted(mapping[u] for u in first[0][v]) != sorted(second[0][mapping[v]]):
+            return None
+    return mapping
+
+
+def wl_hash(csr):
+    """Hash of the stable colour refinement of a graph; equal for isomorphic graphs."""
+    out_lists, in_lists = adjacency_lists(csr)
+    colors = refine(out_lists, in_lists, [0] * csr.num_vertices)
+    signatures = sorted(
+        (colors[v], tuple(sorted(colors[u] for u in out_lists[v])))
+        for v in range(csr.num_vertices)
+    )
+    return hashlib.sha1(repr(signatures).encode()).hexdigest()
@@ -0,0 +1,57 @@
+import threading
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """
+        A backend computation running on a worker thread. `compute` is called
+        with a progress callback taking a fraction in [0, 1]; once the job is
+        cancelled that callback raises JobCancelled, so long computations stop
+        at their next report. The caller polls `done` and reads `result` or
+        `error` afterwards.
+    """
+    def __init__(self, compute, name=""):
+        self.name = name
+        self.compute = compute
+        self.progress = None
+        self.result = None
+        self.error = None
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"job: {name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.result = self.compute(self.report)
+        except JobCancelled:
+            pass
+        except Exception as error:
+            self.error = error
+        finally:
+            self._done.set()
+
+    def report(self, fraction):
+        if self._cancelled.is_set():
+            raise JobCancelled(self.name)
+        self.progress = min(max(fraction, 0.0), 1.0)
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
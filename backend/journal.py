@@ -0,0 +1,279 @@
+import json
+import os
+import threading
+import time
+
+from .binary import BINARY_EXTENSION, graph_arrays, replace_binary
+from .definitions import Graph, Vertex, get_data_path, write_graph_data
+
+JOURNAL_EXTENSION = '.journal'
+
+
+def journal_path(name):
+    """'pet', 'pet.json' and 'pet.npgraph' all log to ./storage/pet.journal."""
+    path = get_data_path(name)
+    for extension in ('.json', BINARY_EXTENSION):
+        if path.endswith(extension):
+            path = path[:-len(extension)]
+    return path + JOURNAL_EXTENSION
+
+
+def apply_op(graph: Graph, op):
+    """
+        Apply one journal entry to `graph`. Entries describe the state they
+        leave behind (a vertex exists, an edge is gone, ...) rather than a
+        change, so replaying one that is already in effect does nothing.
+            {'op': 'add_vertex', 'id', 'x', 'y', 'labels', 'edges': [ids], 'in_edges': [ids]}
+            {'op': 'remove_vertex', 'id'}
+            {'op': 'add_edge', 'u', 'v'} / {'op': 'remove_edge', 'u', 'v'}
+            {'op': 'move', 'id', 'x', 'y'}
+            {'op': 'labels', 'id', 'labels'}
+            {'op': 'positions', 'positions': {id: [x, y]}}
+            {'op': 'relabel', 'labels': {id: labels}}
+            {'op': 'clear'}
+        Raises ValueError for an entry the graph rejects.
+    """
+    kind = op['op']
+    if kind == 'clear':
+        graph.clear()
+        return
+    if kind == 'positions':
+        for vertex_id, (x, y) in op['positions'].items():
+            vertex = graph.get_vertex_by_id(vertex_id)
+            if vertex is not None:
+                vertex.update_position(x, y)
+        return
+    if kind == 'relabel':
+        for vertex_id, labels in op['labels'].items():
+            vertex = graph.get_vertex_by_id(vertex_id)
+            if vertex is not None:
+                vertex.labels = labels
+        return
+    if kind == 'add_vertex':
+        vertex = graph.get_vertex_by_id(op['id'])
+        if vertex is None:
+            vertex = Vertex(None, op['x'], op['y'], id=op['id'])
+            graph.create_vertex(vertex)
+        vertex.update_position(op['x'], op['y'])
+        vertex.labels = op.get('labels', [])
+        for neighbor_id in op.get('edges', ()):
+            _add_edge(graph, op['id'], neighbor_id)
+        for neighbor_id in op.get('in_edges', ()):
+            _add_edge(graph, neighbor_id, op['id'])
+        return
+    if kind == 'add_edge':
+        _add_edge(graph, op['u'], op['v'])
+        return
+    if kind == 'remove_edge':
+        start, end = graph.get_vertex_by_id(op['u']), graph.get_vertex_by_id(op['v'])
+        if start is not None and end is not None and end.id in graph.edges[start.id]:
+            graph.remove_edge(start, end)
+        return
+    vertex = graph.get_vertex_by_id(op['id'])
+    if vertex is None:
+        return
+    if kind == 'remove_vertex':
+        graph.remove_vertex(vertex)
+    elif kind == 'move':
+        vertex.update_position(op['x'], op['y'])
+    elif kind == 'labels':
+        vertex.labels = op['labels']
+    else:
+        raise ValueError(f"Unknown journal entry '{kind}'.")
+
+
+def _add_edge(graph, u, v):
+    start, end = graph.get_vertex_by_id(u), graph.get_vertex_by_id(v)
+    if start is not None and end is not None and end.id not in graph.edges[start.id]:
+        graph.create_edge(start, end)
+
+
+def vertex_state(graph: Graph, vertex: Vertex):
+    """An 'add_vertex' entry that recreates `vertex` with its labels and edges."""
+    return {
+        'op': 'add_vertex', 'id': vertex.id, 'x': vertex.x, 'y': vertex.y,
+        'labels': list(vertex.labels),
+        'edges': list(graph.edges[vertex.id]),
+        'in_edges': list(graph.in_edges.get(vertex.id, ())),
+    }
+
+
+def positions_state(graph: Graph):
+    """A 'positions' entry holding where every vertex is now."""
+    return {'op': 'positions', 'positions': {vertex.id: [vertex.x, vertex.y] for vertex in graph.vertex_index.values()}}
+
+
+def labels_state(graph: Graph):
+    """A 'relabel' entry holding every vertex's current labels."""
+    return {'op': 'relabel', 'labels': {vertex.id: list(vertex.labels) for vertex in graph.vertex_index.values()}}
+
+
+class EditJournal:
+    """
+        Append-only log of edits to a graph, stored next to its JSON snapshot
+        as one JSON entry per line. Appends are flushed to disk in batches:
+        after `sync_every` entries or `sync_seconds`, whichever comes first.
+        `compact` folds the log into the snapshot once it has `compact_every`
+        entries. The same entries, paired with their inverses, back undo and
+        redo. With no name nothing is written, for graphs that were never
+        saved; undo and redo still work.
+    """
+    def __init__(self, name=None, sync_every=32, sync_seconds=1.0, compact_every=1000):
+        self.name = name
+        self.path = None if name is None else journal_path(name)
+        # Entries being folded into the snapshot by an unfinished compaction.
+        self.compacting_path = None if name is None else self.path + '.old'
+        self.writer = None
+        self.sync_every = sync_every
+        self.sync_seconds = sync_seconds
+        self.compact_every = compact_every
+        self.file = None
+        self.pending = 0
+        self.entries = 0
+        self.last_sync = time.monotonic()
+        self.undo_stack = []
+        self.redo_stack = []
+
+    def _open(self):
+        if self.file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.file = open(self.path, 'a')
+        return self.file
+
+    def _append(self, op):
+        if self.path is None:
+            return
+        self._open().write(json.dumps(op, separators=(',', ':')) + '\n')
+        self.pending += 1
+        self.entries += 1
+        if self.pending >= self.sync_every or time.monotonic() - self.last_sync >= self.sync_seconds:
+            self.sync()
+
+    def sync(self):
+        if self.file is not None and self.pending:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def record(self, op, inverse=None):
+        """Log an edit already applied to the graph; without an inverse it can't be undone past."""
+        self._append(op)
+        self.redo_stack = []
+        if inverse is None:
+            self.undo_stack = []
+        else:
+            self.undo_stack.append((op, inverse))
+
+    def undo(self, graph: Graph):
+        if not self.undo_stack:
+            return False
+        op, inverse = self.undo_stack.pop()
+        apply_op(graph, inverse)
+        self._append(inverse)
+        self.redo_stack.append((op, inverse))
+        return True
+
+    def redo(self, graph: Graph):
+        if not self.redo_stack:
+            return False
+        op, inverse = self.redo_stack.pop()
+        apply_op(graph, op)
+        self._append(op)
+        self.undo_stack.append((op, inverse))
+        return True
+
+    def needs_compaction(self):
+        return self.path is not None and self.entries >= self.compact_every
+
+    def compact(self, graph: Graph, background=False):
+        """
+            Fold the log into the snapshot. The graph is serialized here, the
+            log moved aside and a new one started, so edits can go on while
+            the snapshot is written (on a thread if `background`). The moved
+            log is deleted only once the snapshot is in place; until then,
+            replaying it over either snapshot gives the same graph.
+        """
+        if self.path is None:
+            return
+        if self.writer is not None:
+            self.writer.join()
+        self.sync()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if os.path.exists(self.path):
+            if os.path.exists(self.compacting_path):
+                # An earlier compaction never finished; keep its entries too.
+                with open(self.compacting_path, 'a') as older, open(self.path, 'r') as log:
+                    older.write(log.read())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.compacting_path)
+        snapshot_path = get_data_path(self.name)
+        data = graph_arrays(graph) if snapshot_path.endswith(BINARY_EXTENSION) else graph.graph_data()
+        self.entries = 0
+        if background:
+            self.writer = threading.Thread(target=self._write_snapshot, args=(data,), daemon=True)
+            self.writer.start()
+        else:
+            self._write_snapshot(data)
+
+    def _write_snapshot(self, data):
+        path = get_data_path(self.name)
+        if path.endswith(BINARY_EXTENSION):
+            replace_binary(path, data)
+        else:
+            write_graph_data(path, data)
+        if os.path.exists(self.compacting_path):
+            os.remove(self.compacting_path)
+
+    def recover(self, graph: Graph):
+        """Load the snapshot, if there is one, then replay the logged entries on top."""
+        if self.path is None:
+            return 0
+        if os.path.exists(get_data_path(self.name)):
+            graph.import_graph_data(self.name)
+        return self.replay(graph)
+
+    def replay(self, graph: Graph):
+        """
+            Apply the logged entries to `graph`; stops at a torn final line and
+            skips entries the graph rejects. Returns how many were read.
+        """
+        replayed = 0
+        if self.path is None:
+            return replayed
+        for path in (self.compacting_path, self.path):
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r') as log:
+                for line in log:
+                    try:
+                        op = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash mid-write.
+                        break
+                    replayed += 1
+                    try:
+                        apply_op(graph, op)
+                    except ValueError:
+                        continue
+        self.entries = replayed
+        return replayed
+
+    def discard(self):
+        """Forget logged entries, once the snapshot has been overwritten by other means."""
+        self.close()
+        for path in (self.path, self.compacting_path):
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+        self.entries = 0
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.join()
+        self.sync()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,179 @@
+import numpy as np
+
+from .line_graph import edge_endpoints, _ranges
+
+# Repulsion between vertices closer than this many ideal edge lengths is
+# computed exactly, on a fine grid; everything further away comes from the
+# centroids of a coarse FAR_FIELD_CELLS x FAR_FIELD_CELLS grid.
+REPULSION_RANGE = 2.0
+FAR_FIELD_CELLS = 24
+# A vertex meets at most this many vertices of any one crowded cell.
+CELL_SAMPLE = 32
+# Pull towards the centre, so components that repel nothing don't drift apart.
+GRAVITY = 0.01
+
+
+def _neighbor_pairs(positions, cell_size):
+    """
+        Index pairs (i, j), each once, of vertices in the same or adjacent grid
+        cells, and a weight per pair, generated with array operations only.
+        A vertex meets at most CELL_SAMPLE vertices of a crowded cell, a
+        window of them weighted by how many they stand for, so even a drawing
+        with every vertex in one cell gives O(n) pairs.
+    """
+    cells = np.floor((positions - positions.min(axis=0)) / cell_size).astype(np.int64)
+    stride = int(cells[:, 1].max()) + 3
+    keys = cells[:, 0] * stride + cells[:, 1] + 1
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    unique_keys, starts, counts = np.unique(sorted_keys, return_index=True, return_counts=True)
+    own_cell = np.repeat(np.arange(len(unique_keys)), counts)
+    position = np.arange(len(order))
+    rank = position - starts[own_cell]
+    size = counts[own_cell]
+
+    # Pairs inside a cell: each vertex with the ones after it in the same cell.
+    # In a crowded cell, half a sample after it, wrapping round, which still
+    # gives every pair at most once.
+    crowded = size > CELL_SAMPLE + 1
+    meet = np.where(crowded, CELL_SAMPLE // 2, size - rank - 1)
+    sources = [np.repeat(position, meet)]
+    targets = [np.repeat(starts[own_cell], meet) + _ranges(rank + 1, meet) % np.repeat(size, meet)]
+    weights = [np.repeat(np.where(crowded, (size - 1) / CELL_SAMPLE, 1.0), meet)]
+    # Pairs across cells: half of the 8 neighbours, so each pair appears once.
+    for dx, dy in ((1, -1), (1, 0), (1, 1), (0, 1)):
+        wanted = unique_keys + dx * stride + dy
+        slot = np.minimum(np.searchsorted(unique_keys, wanted), len(unique_keys) - 1)
+        found = unique_keys[slot] == wanted
+        other_count = np.where(found, counts[slot], 0)[own_cell]
+        meet = np.minimum(other_count, CELL_SAMPLE)
+        # Consecutive vertices start their windows a sample apart, to spread them over the cell.
+        first = np.where(other_count > CELL_SAMPLE, rank * CELL_SAMPLE, 0)
+        sources.append(np.repeat(position, meet))
+        targets.append(
+            np.repeat(starts[slot][own_cell], meet) + _ranges(first, meet) % np.repeat(np.maximum(other_count, 1), meet)
+        )
+        weights.append(np.repeat(other_count / np.maximum(meet, 1), meet))
+    return order[np.concatenate(sources)], order[np.concatenate(targets)], np.concatenate(weights)
+
+
+def _far_field(positions, k):
+    """
+        Repulsion on each vertex from every other coarse cell, each cell
+        standing in for its vertices at their centroid. Cell boundaries are
+        per-axis quantiles, so dense regions get small cells. Costs O(cells^2).
+    """
+    side = FAR_FIELD_CELLS
+    quantiles = np.linspace(0, 1, side + 1)[1:-1]
+    cells = np.column_stack([
+        np.searchsorted(np.quantile(positions[:, axis], quantiles), positions[:, axis])
+        for axis in (0, 1)
+    ])
+    keys = cells[:, 0] * side + cells[:, 1]
+    occupied, cell_of, mass = np.unique(keys, return_inverse=True, return_counts=True)
+    centroids = np.column_stack((
+        np.bincount(cell_of, weights=positions[:, 0]),
+        np.bincount(cell_of, weights=positions[:, 1]),
+    )) / mass[:, None]
+    dx = centroids[:, 0, None] - centroids[None, :, 0]
+    dy = centroids[:, 1, None] - centroids[None, :, 1]
+    distance_sq = dx * dx + dy * dy
+    np.fill_diagonal(distance_sq, np.inf)
+    strength = k * k * mass[None, :] / np.maximum(distance_sq, 1e-4)
+    return (dx * strength).sum(axis=1)[cell_of], (dy * strength).sum(axis=1)[cell_of]
+
+
+def _accumulate(n, sources, targets, dx, dy):
+    """Add (dx, dy) to the sources and subtract it from the targets."""
+    return (
+        np.bincount(sources, weights=dx, minlength=n) - np.bincount(targets, weights=dx, minlength=n),
+        np.bincount(sources, weights=dy, minlength=n) - np.bincount(targets, weights=dy, minlength=n),
+    )
+
+
+def _iterate(positions, endpoints, k, temperatures, center, progress=None):
+    n = len(positions)
+    reach_sq = (REPULSION_RANGE * k) ** 2
+    x, y = positions[:, 0].copy(), positions[:, 1].copy()
+    heads, tails = endpoints[:, 0], endpoints[:, 1]
+    for step, temperature in enumerate(temperatures):
+        if progress is not None:
+            progress(step / len(temperatures))
+        # Repulsion k^2 / d along the unit vector, for pairs within range.
+        sources, targets, weights = _neighbor_pairs(np.column_stack((x, y)), REPULSION_RANGE * k)
+        dx, dy = x[sources] - x[targets], y[sources] - y[targets]
+        distance_sq = dx * dx + dy * dy
+        near = distance_sq < reach_sq
+        sources, targets, dx, dy = sources[near], targets[near], dx[near], dy[near]
+        strength = weights[near] * k * k / np.maximum(distance_sq[near], 1e-4)
+        push_x, push_y = _accumulate(n, sources, targets, dx * strength, dy * strength)
+        far_x, far_y = _far_field(np.column_stack((x, y)), k)
+
+        # Attraction d^2 / k along the unit vector.
+        dx, dy = x[heads] - x[tails], y[heads] - y[tails]
+        strength = np.sqrt(dx * dx + dy * dy) / k
+        pull_x, pull_y = _accumulate(n, heads, tails, dx * strength, dy * strength)
+
+        move_x = push_x + far_x - pull_x + GRAVITY * (center[0] - x)
+        move_y = push_y + far_y - pull_y + GRAVITY * (center[1] - y)
+        length = np.maximum(np.sqrt(move_x * move_x + move_y * move_y), 1e-9)
+        scale = np.minimum(length, temperature) / length
+        x += move_x * scale
+        y += move_y * scale
+    return np.column_stack((x, y))
+
+
+def _fit(positions, width, height, margin):
+    low, high = positions.min(axis=0), positions.max(axis=0)
+    extent = np.maximum(high - low, 1e-9)
+    scale = min((width - 2 * margin) / extent[0], (height - 2 * margin) / extent[1])
+    size = (high - low) * scale
+    return (positions - low) * scale + (np.array([width, height]) - size) / 2
+
+
+def fruchterman_reingold(csr, positions=None, iterations=None, width=500, height=400, margin=20, seed=None, progress=None):
+    """
+        Spring-electrical layout of a CSRGraph as an (n, 2) array fitted to a
+        width x height box. Starts from `positions` if given, otherwise from
+        random points; edges attract and all vertices repel, with the step
+        size cooling linearly to zero. `progress` gets the fraction done.
+    """
+    n = csr.num_vertices
+    if n == 0:
+        return np.zeros((0, 2))
+    if iterations is None:
+        # Small graphs can afford the extra steps that keep them from folding over.
+        iterations = int(np.clip(200000 // n, 50, 300))
+    k = np.sqrt(width * height / n)
+    if positions is None:
+        positions = np.random.default_rng(seed).uniform((0, 0), (width, height), size=(n, 2))
+    positions = np.array(positions, dtype=float).reshape(n, 2)
+    center = np.array([width / 2, height / 2])
+    temperatures = np.linspace(width / 10, 0, iterations, endpoint=False)
+    positions = _iterate(positions, edge_endpoints(csr), k, temperatures, center, progress)
+    return _fit(positions, width, height, margin)
+
+
+def relax(csr, positions, iterations=10, width=500, height=400, progress=None):
+    """
+        A few low-temperature iterations from the current positions, to tidy
+        up after edits without moving the rest of the drawing around.
+    """
+    n = csr.num_vertices
+    if n == 0:
+        return np.zeros((0, 2))
+    positions = np.array(positions, dtype=float).reshape(n, 2)
+    endpoints = edge_endpoints(csr)
+    if len(endpoints) and n > 1:
+        # The ideal edge length that puts this drawing in equilibrium: summing
+        # position . force over all vertices gives sum(d^3) / k = k^2 * pairs.
+        lengths = np.sqrt(((positions[endpoints[:, 0]] - positions[endpoints[:, 1]]) ** 2).sum(axis=1))
+        k = np.cbrt((lengths ** 3).sum() / (n * (n - 1) / 2))
+    else:
+        k = 0
+    # Never below the ideal length for the box: a drawing shrunk into a
+    # corner would otherwise put most vertices in a handful of cells.
+    k = max(k, np.sqrt(width * height / n))
+    temperatures = np.linspace(k / 2, 0, iterations, endpoint=False)
+    positions = _iterate(positions, endpoints, k, temperatures, positions.mean(axis=0), progress)
+    return np.clip(positions, 0, (width, height))
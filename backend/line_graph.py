@@ -0,0 +1,86 @@
+import numpy as np
+
+from .csr import CSRGraph
+
+
+def edge_endpoints(csr):
+    """
+        (m, 2) endpoints of every edge; row i is line-graph vertex i. Undirected
+        edges are taken once (u < v), and loops are left out.
+    """
+    sources = csr.sources().astype(np.int64)
+    targets = csr.indices.astype(np.int64)
+    keep = sources != targets if csr.directed else sources < targets
+    return np.column_stack((sources[keep], targets[keep]))
+
+
+def line_graph_size(csr):
+    """Number of edges L(G) will have, without building it."""
+    endpoints = edge_endpoints(csr)
+    if csr.directed:
+        return int(np.bincount(endpoints[:, 0], minlength=csr.num_vertices)[endpoints[:, 1]].sum())
+    sizes = np.bincount(endpoints.ravel(), minlength=csr.num_vertices)
+    return int((sizes * (sizes - 1) // 2).sum())
+
+
+def _ranges(starts, counts):
+    """Concatenation of arange(s, s + c) for each (s, c), without a Python loop."""
+    total = int(counts.sum())
+    step = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + step
+
+
+def _chunks(weights, chunk_size):
+    """Split positions into consecutive slices whose weights sum to about `chunk_size`."""
+    boundaries = np.searchsorted(np.cumsum(weights), np.arange(chunk_size, int(weights.sum()), chunk_size))
+    edges = np.unique(np.concatenate(([0], boundaries + 1, [len(weights)])))
+    return zip(edges[:-1], edges[1:])
+
+
+def iter_line_graph_edges(csr, chunk_size=1 << 20):
+    """
+        Yield (sources, targets) arrays of line-graph edges, about `chunk_size`
+        at a time, so L(G) never has to be held in memory at once. Costs
+        O(sum of deg^2).
+    """
+    endpoints = edge_endpoints(csr)
+    if csr.directed:
+        # e = (u, v) is followed by every edge leaving v. Edges keep CSR order
+        # with loops left out, so the ones leaving v are still consecutive.
+        out_degrees = np.bincount(endpoints[:, 0], minlength=csr.num_vertices)
+        first_edge = np.zeros(csr.num_vertices + 1, dtype=np.int64)
+        np.cumsum(out_degrees, out=first_edge[1:])
+        partners = out_degrees[endpoints[:, 1]]
+        for start, stop in _chunks(partners, chunk_size):
+            counts = partners[start:stop]
+            sources = np.repeat(np.arange(start, stop), counts)
+            targets = _ranges(first_edge[endpoints[start:stop, 1]], counts)
+            yield sources, targets
+        return
+
+    edge_ids = np.arange(len(endpoints))
+    by_vertex = np.argsort(endpoints.ravel(), kind='stable')
+    incidence = np.repeat(edge_ids, 2)[by_vertex]
+    sizes = np.bincount(endpoints.ravel(), minlength=csr.num_vertices)
+    group_start = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    # Each incidence is paired with the later incidences at the same vertex.
+    partners = np.repeat(sizes, sizes) - (np.arange(len(incidence)) - group_start) - 1
+    for start, stop in _chunks(partners, chunk_size):
+        counts = partners[start:stop]
+        positions = np.repeat(np.arange(start, stop), counts)
+        yield incidence[positions], incidence[_ranges(np.arange(start, stop) + 1, counts)]
+
+
+def line_graph_csr(csr):
+    endpoints = edge_endpoints(csr)
+    pieces = list(iter_line_graph_edges(csr))
+    sources = np.concatenate([s for s, _ in pieces]) if pieces else np.empty(0, dtype=np.int64)
+    targets = np.concatenate([t for _, t in pieces]) if pieces else np.empty(0, dtype=np.int64)
+    return CSRGraph.from_edges(len(endpoints), sources, targets, directed=csr.directed)
+
+
+def iterated_line_graph(csr, times):
+    """L^times(G) as a CSRGraph; intermediate levels are kept only as compact arrays."""
+    for _ in range(times):
+        csr = line_graph_csr(csr)
+    return csr
@@ -0,0 +1,263 @@
+import heapq
+import math
+
+import numpy as np
+
+
+def edge_lengths(csr, positions):
+    """Euclidean length of every CSR entry, from an (n, 2) array of positions."""
+    delta = positions[csr.sources()] - positions[csr.indices]
+    return np.sqrt((delta ** 2).sum(axis=1))
+
+
+def _entry_positions(csr, sources, targets):
+    """Positions in `csr.indices` of every entry from sources[k] to targets[k], and the k of each."""
+    n = csr.num_vertices
+    keys = csr.sources().astype(np.int64) * n + csr.indices
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    wanted = np.asarray(sources, dtype=np.int64) * n + np.asarray(targets, dtype=np.int64)
+    low, high = np.searchsorted(keys, wanted, 'left'), np.searchsorted(keys, wanted, 'right')
+    # Parallel edges share a weight, so a pair can own several entries.
+    counts = high - low
+    pairs = np.repeat(np.arange(len(wanted)), counts)
+    offsets = np.arange(len(pairs)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return order[low[pairs] + offsets], pairs
+
+
+class EdgeWeights:
+    """
+        Edge weights as arrays parallel to the `indices` of a CSR snapshot:
+        explicit weights where set (NaN elsewhere), Euclidean lengths for the
+        rest. A new snapshot realigns the explicit weights in numpy; moving a
+        vertex only recomputes the lengths of its own edges.
+    """
+    def __init__(self):
+        # Snapshot `explicit` is aligned with; None until a weight is set.
+        self.csr = None
+        self.explicit = None
+        # Search tables, valid for `table_csr` apart from the `moved` vertex ids.
+        self.table_csr = None
+        self.moved = set()
+
+    def _align(self, csr):
+        if self.csr is csr:
+            return
+        values = np.full(len(csr.indices), np.nan)
+        if self.explicit is not None:
+            index = csr.index
+            remap = np.array([index.get(vertex_id, -1) for vertex_id in self.csr.ids] + [-1], dtype=np.int64)
+            entries = np.flatnonzero(~np.isnan(self.explicit))
+            sources = remap[self.csr.sources()[entries]]
+            targets = remap[self.csr.indices[entries]]
+            alive = (sources >= 0) & (targets >= 0)
+            positions, pairs = _entry_positions(csr, sources[alive], targets[alive])
+            values[positions] = self.explicit[entries[alive]][pairs]
+        self.csr, self.explicit = csr, values
+
+    def assign(self, csr, sources, targets, weights):
+        """Set the weights of the edges sources[k] -> targets[k], given as indices into `csr`."""
+        self._align(csr)
+        sources, targets = np.asarray(sources, dtype=np.int64), np.asarray(targets, dtype=np.int64)
+        weights = np.asarray(weights, dtype=float)
+        if not csr.directed:
+            sources, targets = np.concatenate((sources, targets)), np.concatenate((targets, sources))
+            weights = np.concatenate((weights, weights))
+        positions, pairs = _entry_positions(csr, sources, targets)
+        self.explicit[positions] = weights[pairs]
+        if self.table_csr is csr:
+            for position, weight in zip(positions.tolist(), weights[pairs].tolist()):
+                self.values[position] = weight
+            self.scale = None
+
+    def _entries(self, v1_id, v2_id):
+        """Positions of the v1 -> v2 entries in the aligned snapshot."""
+        index = self.csr.index
+        if v1_id not in index or v2_id not in index:
+            return np.zeros(0, dtype=np.int64)
+        i, j = index[v1_id], index[v2_id]
+        start = self.csr.indptr[i]
+        return start + np.flatnonzero(self.csr.indices[start:self.csr.indptr[i + 1]] == j)
+
+    def get(self, v1_id, v2_id):
+        """The explicit weight of an edge, or None."""
+        if self.explicit is None:
+            return None
+        entries = self._entries(v1_id, v2_id)
+        if not len(entries) or np.isnan(self.explicit[entries[0]]):
+            return None
+        return float(self.explicit[entries[0]])
+
+    def unset(self, v1_id, v2_id):
+        """Forget the weight of a removed edge, so it doesn't come back with the edge."""
+        if self.explicit is not None:
+            self.explicit[self._entries(v1_id, v2_id)] = np.nan
+
+    def forget_vertex(self, vertex_id):
+        if self.explicit is None or vertex_id not in self.csr.index:
+            return
+        i = self.csr.index[vertex_id]
+        self.explicit[self.csr.indptr[i]:self.csr.indptr[i + 1]] = np.nan
+        self.explicit[self.csr.indices == i] = np.nan
+
+    def items(self):
+        """(source id, target id, weight) of every explicitly weighted entry."""
+        if self.explicit is None:
+            return
+        entries = np.flatnonzero(~np.isnan(self.explicit))
+        ids = self.csr.ids
+        sources = self.csr.sources()[entries].tolist()
+        targets = self.csr.indices[entries].tolist()
+        for source, target, weight in zip(sources, targets, self.explicit[entries].tolist()):
+            yield ids[source], ids[target], weight
+
+    def move(self, vertex_id):
+        self.moved.add(vertex_id)
+
+    def move_all(self):
+        self.table_csr = None
+
+    def clear(self):
+        self.__init__()
+
+    def tables(self, csr, vertex_index):
+        """
+            (adjacency, coordinates, scale) for dijkstra and astar over `csr`:
+            (indptr, indices, weights) as plain lists, the form the heap
+            searches walk fastest, (x, y) lists and the astar scale. Built once
+            per snapshot, then patched for moved vertices.
+        """
+        self._align(csr)
+        if self.table_csr is not csr:
+            coordinates = np.array(
+                [(vertex_index[vertex_id].x, vertex_index[vertex_id].y) for vertex_id in csr.ids], dtype=float
+            ).reshape(-1, 2)
+            self.lengths = edge_lengths(csr, coordinates)
+            self.points, self.coordinates, self.sources = coordinates, coordinates.tolist(), csr.sources()
+            self.values = np.where(np.isnan(self.explicit), self.lengths, self.explicit).tolist()
+            self.indptr, self.indices = csr.indptr.tolist(), csr.indices.tolist()
+            # Entries grouped by target, to find the edges into a moved vertex.
+            self.by_target = np.argsort(csr.indices, kind='stable')
+            self.in_indptr = np.zeros(csr.num_vertices + 1, dtype=np.int64)
+            np.cumsum(np.bincount(csr.indices, minlength=csr.num_vertices), out=self.in_indptr[1:])
+            self.table_csr, self.moved, self.scale = csr, set(), None
+        elif self.moved:
+            index = csr.index
+            moved = [index[vertex_id] for vertex_id in self.moved if vertex_id in index]
+            for i in moved:
+                vertex = vertex_index[csr.ids[i]]
+                self.coordinates[i] = [vertex.x, vertex.y]
+                self.points[i] = (vertex.x, vertex.y)
+            entries = np.unique(np.concatenate([np.zeros(0, dtype=np.int64)] + [
+                np.concatenate((np.arange(csr.indptr[i], csr.indptr[i + 1]), self.by_target[self.in_indptr[i]:self.in_indptr[i + 1]]))
+                for i in moved
+            ]))
+            delta = self.points[self.sources[entries]] - self.points[csr.indices[entries]]
+            self.lengths[entries] = np.hypot(delta[:, 0], delta[:, 1])
+            values = np.where(np.isnan(self.explicit[entries]), self.lengths[entries], self.explicit[entries])
+            for position, value in zip(entries.tolist(), values.tolist()):
+                self.values[position] = value
+            self.moved, self.scale = set(), None
+        if self.scale is None:
+            self.scale = self._scale()
+        return (self.indptr, self.indices, self.values), self.coordinates, self.scale
+
+    def _scale(self):
+        """Largest factor that keeps the straight-line heuristic below every edge's weight."""
+        positive = self.lengths > 0
+        if not positive.any():
+            return 0.0
+        weighted = positive & ~np.isnan(self.explicit)
+        if not weighted.any():
+            return 1.0
+        return float(min(1.0, (self.explicit[weighted] / self.lengths[weighted]).min()))
+
+    def array(self, csr, vertex_index):
+        """Weight of every entry of `csr.indices`."""
+        self.tables(csr, vertex_index)
+        return np.array(self.values, dtype=float)
+
+
+def _result(n, distance, parent):
+    distances = np.full(n, np.inf)
+    predecessors = np.full(n, -1, dtype=np.int64)
+    if distance:
+        distances[np.fromiter(distance.keys(), dtype=np.int64, count=len(distance))] = list(distance.values())
+    if parent:
+        predecessors[np.fromiter(parent.keys(), dtype=np.int64, count=len(parent))] = list(parent.values())
+    return distances, predecessors
+
+
+def dijkstra(adjacency, sources, target=None):
+    """
+        Binary-heap Dijkstra from one source index or several (multi-source:
+        distance to the nearest). Stops as soon as `target` is settled.
+        Returns (distances, predecessors) arrays; unreached vertices are inf
+        and -1. After an early exit, unsettled vertices keep tentative values.
+    """
+    indptr, indices, weights = adjacency
+    distance, parent = {}, {}
+    heap = []
+    for source in np.atleast_1d(sources).tolist():
+        distance[source] = 0.0
+        heap.append((0.0, source))
+    heapq.heapify(heap)
+    settled = set()
+    while heap:
+        d, u = heapq.heappop(heap)
+        if u in settled:
+            continue
+        settled.add(u)
+        if u == target:
+            break
+        for position in range(indptr[u], indptr[u + 1]):
+            v = indices[position]
+            candidate = d + weights[position]
+            if candidate < distance.get(v, math.inf):
+                distance[v] = candidate
+                parent[v] = u
+                heapq.heappush(heap, (candidate, v))
+    return _result(len(indptr) - 1, distance, parent)
+
+
+def astar(adjacency, positions, source, target, scale=1.0):
+    """
+        A* from `source` to `target`, guided by straight-line distance times
+        `scale`. The heuristic is admissible as long as no edge weighs less
+        than `scale` times its length, so paths are still shortest.
+        `positions` is a sequence of (x, y); a plain list is fastest.
+    """
+    indptr, indices, weights = adjacency
+    tx, ty = positions[target]
+
+    def estimate(v):
+        x, y = positions[v]
+        return scale * math.hypot(x - tx, y - ty)
+
+    distance, parent = {source: 0.0}, {}
+    heap = [(estimate(source), source)]
+    settled = set()
+    while heap:
+        _, u = heapq.heappop(heap)
+        if u in settled:
+            continue
+        settled.add(u)
+        if u == target:
+            break
+        d = distance[u]
+        for position in range(indptr[u], indptr[u + 1]):
+            v = indices[position]
+            candidate = d + weights[position]
+            if candidate < distance.get(v, math.inf):
+                distance[v] = candidate
+                parent[v] = u
+                heapq.heappush(heap, (candidate + estimate(v), v))
+    return _result(len(indptr) - 1, distance, parent)
+
+
+def path_to(predecessors, target):
+    """Vertex indices from a source of the search to `target`, which must have been reached."""
+    path = [target]
+    while predecessors[path[-1]] >= 0:
+        path.append(int(predecessors[path[-1]]))
+    return path[::-1]
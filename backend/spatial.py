@@ -0,0 +1,92 @@
+import math
+
+import numpy as np
+
+
+class SpatialHash:
+    """
+        Uniform grid over vertex positions. Each vertex lives in the cell of
+        its center, so point and rectangle queries only visit nearby cells.
+    """
+    def __init__(self, cell_size=32):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.max_radius = 0
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, vertex):
+        self.cells.setdefault(self._cell(vertex.x, vertex.y), {})[vertex.id] = vertex
+        self.max_radius = max(self.max_radius, vertex.radius)
+
+    def insert_many(self, vertices, positions=None):
+        """Insert vertices in bulk, grouped by cell; `positions` saves reading (x, y) off each vertex."""
+        if not vertices:
+            return
+        if positions is None:
+            positions = np.array([(vertex.x, vertex.y) for vertex in vertices], dtype=float)
+        cells = np.floor(np.asarray(positions, dtype=float) / self.cell_size).astype(np.int64)
+        order = np.lexsort((cells[:, 1], cells[:, 0]))
+        cells = cells[order]
+        starts = np.flatnonzero(np.concatenate(([True], (cells[1:] != cells[:-1]).any(axis=1))))
+        ends = np.append(starts[1:], len(order)).tolist()
+        order = order.tolist()
+        for start, end, (cx, cy) in zip(starts.tolist(), ends, cells[starts].tolist()):
+            members = [vertices[i] for i in order[start:end]]
+            self.cells.setdefault((cx, cy), {}).update((vertex.id, vertex) for vertex in members)
+        self.max_radius = max(self.max_radius, max(vertex.radius for vertex in vertices))
+
+    def remove(self, vertex, x=None, y=None):
+        cell = self._cell(vertex.x if x is None else x, vertex.y if y is None else y)
+        bucket = self.cells.get(cell)
+        if bucket is not None:
+            bucket.pop(vertex.id, None)
+            if not bucket:
+                del self.cells[cell]
+
+    def move(self, vertex, old_x, old_y):
+        if self._cell(old_x, old_y) != self._cell(vertex.x, vertex.y):
+            self.remove(vertex, old_x, old_y)
+            self.insert(vertex)
+
+    def clear(self):
+        self.cells = {}
+        self.max_radius = 0
+
+    def _cells_in(self, x1, y1, x2, y2):
+        (cx1, cy1), (cx2, cy2) = self._cell(x1, y1), self._cell(x2, y2)
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket:
+                    yield bucket
+
+    def query_region(self, x1, y1, x2, y2):
+        """Vertices whose centers lie in the rectangle, in any corner order."""
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        return [
+            vertex
+            for bucket in self._cells_in(x1, y1, x2, y2)
+            for vertex in bucket.values()
+            if x1 <= vertex.x <= x2 and y1 <= vertex.y <= y2
+        ]
+
+    def query_point(self, x, y, radius=None):
+        """
+            Closest vertex containing the point, or, if `radius` is given,
+            closest vertex center within that square distance.
+        """
+        reach = self.max_radius if radius is None else radius
+        best, best_distance = None, None
+        for bucket in self._cells_in(x - reach, y - reach, x + reach, y + reach):
+            for vertex in bucket.values():
+                hit = vertex.contains_point(x, y) if radius is None else (
+                    abs(vertex.x - x) <= radius and abs(vertex.y - y) <= radius
+                )
+                if hit:
+                    distance = (vertex.x - x) ** 2 + (vertex.y - y) ** 2
+                    if best is None or distance < best_distance:
+                        best, best_distance = vertex, distance
+        return best
@@ -0,0 +1,50 @@
+from collections import deque
+
+# Step events yielded by the traversals below, as (kind, vertex_id, parent_id, depth):
+#   'discover'  vertex first reached, through the edge from `parent_id`
+#   'visit'     vertex taken off the queue / stack and expanded
+#   'finish'    every neighbor of the vertex has been handled (DFS only)
+DISCOVER, VISIT, FINISH = 'discover', 'visit', 'finish'
+
+
+def bfs_events(csr, source):
+    """Breadth-first search from index `source` of a CSRGraph, one event at a time."""
+    ids = csr.ids
+    indptr, indices = csr.indptr.tolist(), csr.indices.tolist()
+    depth = {source: 0}
+    queue = deque([source])
+    yield (DISCOVER, ids[source], None, 0)
+    while queue:
+        vertex = queue.popleft()
+        level = depth[vertex]
+        yield (VISIT, ids[vertex], None, level)
+        for neighbor in indices[indptr[vertex]:indptr[vertex + 1]]:
+            if neighbor not in depth:
+                depth[neighbor] = level + 1
+                queue.append(neighbor)
+                yield (DISCOVER, ids[neighbor], ids[vertex], level + 1)
+
+
+def dfs_events(csr, source):
+    """Depth-first search from index `source`, iterative so deep graphs don't hit the recursion limit."""
+    ids = csr.ids
+    indptr, indices = csr.indptr.tolist(), csr.indices.tolist()
+    depth = {source: 0}
+    yield (DISCOVER, ids[source], None, 0)
+    yield (VISIT, ids[source], None, 0)
+    stack = [(source, indptr[source])]
+    while stack:
+        vertex, position = stack[-1]
+        end = indptr[vertex + 1]
+        while position < end and indices[position] in depth:
+            position += 1
+        if position == end:
+            stack.pop()
+            yield (FINISH, ids[vertex], None, depth[vertex])
+            continue
+        stack[-1] = (vertex, position + 1)
+        neighbor = indices[position]
+        depth[neighbor] = depth[vertex] + 1
+        stack.append((neighbor, indptr[neighbor]))
+        yield (DISCOVER, ids[neighbor], ids[vertex], depth[neighbor])
+        yield (VISIT, ids[neighbor], None, depth[neighbor])
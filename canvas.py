@@ -1,14 +1,109 @@
+import os
 import tkinter as tk
 from tkinter import messagebox, simpledialog
-from backend.definitions import Graph, Vertex
+from backend.definitions import Graph, Vertex, int_to_color
+from backend.jobs import Job
+from backend.journal import EditJournal, labels_state, positions_state, vertex_state
 import string
 import random
+import time
+
+# Vertices up to which Color Graph looks for an optimal colouring.
+EXACT_COLORING_LIMIT = 40
 
 def generate_random_id(length=8):
     characters = string.ascii_letters + string.digits
     random_id = ''.join(random.choices(characters, k=length))
     return random_id
 
+class Animation:
+    """
+        Plays a stream of traversal events (see backend.traversal) on a
+        GraphBuilder's canvas. Every `frame_ms` it plays `events_per_frame`
+        events, or fewer if `budget_ms` runs out first, keeps only the final
+        look of each vertex and edge touched in that frame, and applies those
+        in one pass, so big graphs never block the event loop.
+    """
+    def __init__(self, builder, events, events_per_frame=1, frame_ms=30, budget_ms=8):
+        self.builder = builder
+        self.events = iter(events)
+        self.events_per_frame = events_per_frame
+        self.frame_ms = frame_ms
+        self.budget_ms = budget_ms
+        self.paused = False
+        self.finished = False
+        self.after_id = None
+
+    def start(self):
+        self.paused = False
+        self._schedule()
+        return self
+
+    def _schedule(self):
+        if self.after_id is None and not self.finished:
+            self.after_id = self.builder.root.after(self.frame_ms, self._frame)
+
+    def _frame(self):
+        self.after_id = None
+        if self.paused:
+            return
+        self.advance(self.events_per_frame, self.budget_ms)
+        self._schedule()
+
+    def pause(self):
+        self.paused = True
+        if self.after_id is not None:
+            self.builder.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def resume(self):
+        self.start()
+
+    def step(self):
+        """Pause and play exactly one event."""
+        self.pause()
+        self.advance(max_events=1)
+
+    def stop(self):
+        self.pause()
+        self.finished = True
+
+    def advance(self, max_events=None, budget_ms=None):
+        deadline = None if budget_ms is None else time.perf_counter() + budget_ms / 1000
+        vertex_looks, edge_looks = {}, {}
+        count = 0
+        for kind, vertex_id, parent_id, depth in self.events:
+            if kind == 'discover':
+                vertex_looks[vertex_id] = {'fill': 'gray'}
+                if parent_id is not None:
+                    edge_looks[self.builder.edge_key(parent_id, vertex_id)] = {'fill': 'red', 'width': 2}
+            elif kind == 'visit':
+                vertex_looks[vertex_id] = {'fill': int_to_color(depth), 'outline': 'red', 'width': 3}
+            else:
+                vertex_looks[vertex_id] = {'fill': int_to_color(depth), 'outline': 'black', 'width': 1}
+            count += 1
+            if max_events is not None and count >= max_events:
+                break
+            # Checking the clock on every event would cost more than the events.
+            if deadline is not None and count % 64 == 0 and time.perf_counter() > deadline:
+                break
+        else:
+            self.finished = True
+        self.render(vertex_looks, edge_looks)
+        return count
+
+    def render(self, vertex_looks, edge_looks):
+        canvas, graph = self.builder.canvas, self.builder.graph
+        for vertex_id, look in vertex_looks.items():
+            vertex = graph.get_vertex_by_id(vertex_id)
+            if vertex is not None and vertex.is_drawn:
+                canvas.itemconfig(vertex.vertex_id, **look)
+        for key, look in edge_looks.items():
+            line = self.builder.edge_items.get(key)
+            if line is not None:
+                canvas.itemconfig(line, **look)
+
+
 class GraphBuilder:
     def __init__(self, root):
         self.root = root
@@ -17,17 +112,34 @@ class GraphBuilder:
 
         self.current_state = 'add_vertex'
         self.selected_vertex = None
+        # (start_id, end_id) -> canvas line; undirected edges are keyed once.
+        self.edge_items = {}
+        # Background computation in flight, if any; see run_job.
+        self.job = None
+        self.animation = None
+        self.path_start = None
+        # Canvas lines drawn in a highlight colour, restored by clear_highlights.
+        self.highlighted = []
+        # Where the vertex being dragged started, so the move can be undone.
+        self.drag_origin = None
+        # Edits since the last save; replayed over the saved graph on startup.
+        self.journal = EditJournal(self.graph.name)
 
         self.setup_ui()
         self.bind_canvas_events()
         self.update_button_colors()
+        self.journal.recover(self.graph)
+        self.update_edges()
+        self.root.after(1000, self._autosave)
     
     # State Functions
     def _add_vertex(self, x, y):
         vertex_id = generate_random_id()
-        if vertex_id and vertex_id not in self.graph.vertices:
+        if vertex_id and vertex_id not in self.graph.vertex_index:
             vertex = Vertex(self.canvas, x, y, id=vertex_id)
             self.graph.create_vertex(vertex)
+            vertex.draw_vertex(self.canvas)
+            self.journal.record(vertex_state(self.graph, vertex), {'op': 'remove_vertex', 'id': vertex_id})
 
     def _start_edge(self, x, y):
         vertex_label = self.find_vertex_by_position(x, y)
@@ -36,14 +148,44 @@ class GraphBuilder:
                 self.edge_start = vertex_label
                 self.select_vertex(x, y)
             else:
-                self.graph.create_edge(self.edge_start, vertex_label)
-                self.draw_edge(self.edge_start, vertex_label)
+                start, end = self.edge_start, vertex_label
+                new = end.id not in self.graph.edges[start.id]
+                self.graph.create_edge(start, end)
+                if new:
+                    self.journal.record(
+                        {'op': 'add_edge', 'u': start.id, 'v': end.id},
+                        {'op': 'remove_edge', 'u': start.id, 'v': end.id}
+                    )
+                self.draw_edge(start, end)
                 del self.edge_start
                 self.select_vertex(0, 0)
 
     def _move_vertex(self, x, y):
         if self.selected_vertex:
             self.selected_vertex.update_position(x, y)
+            self.move_edges(self.selected_vertex)
+
+    def _select_to_move(self, x, y):
+        self.select_vertex(x, y)
+        vertex = self.selected_vertex
+        self.drag_origin = (vertex.x, vertex.y) if vertex else None
+
+    def _end_move(self):
+        vertex, origin, self.drag_origin = self.selected_vertex, self.drag_origin, None
+        if vertex is None or origin is None or origin == (vertex.x, vertex.y):
+            return
+        self.journal.record(
+            {'op': 'move', 'id': vertex.id, 'x': vertex.x, 'y': vertex.y},
+            {'op': 'move', 'id': vertex.id, 'x': origin[0], 'y': origin[1]}
+        )
+
+    def _relabel(self, vertex, label):
+        previous = list(vertex.labels)
+        vertex.add_label(label)
+        self.journal.record(
+            {'op': 'labels', 'id': vertex.id, 'labels': list(vertex.labels)},
+            {'op': 'labels', 'id': vertex.id, 'labels': previous}
+        )
     
     def _color_vertex(self, x, y):
         vertex = self.find_vertex_by_position(x, y)
@@ -52,40 +194,258 @@ class GraphBuilder:
         for neighbor in neighbors:
             if ask in neighbor.labels:
                 return messagebox.askretrycancel("Miscoloring", "Seems like that vertex is already colored that!")
-        vertex.add_label(ask)
+        self._relabel(vertex, ask)
     
+    def _shortest_path(self, x, y):
+        vertex = self.find_vertex_by_position(x, y)
+        if not vertex:
+            return
+        if self.path_start is None:
+            self.path_start = vertex
+            self.select_vertex(x, y)
+            return
+        start, self.path_start = self.path_start, None
+        self.select_vertex(0, 0)
+        length, path = self.graph.shortest_path(start, vertex)
+        self.clear_highlights()
+        if not path:
+            return messagebox.showinfo("Shortest Path", "There is no path between those vertices.")
+        self.highlight_edges([self.edge_key(a.id, b.id) for a, b in zip(path, path[1:])], 'blue')
+        self.status.config(text=f"Path length: {length:.1f}")
+
     def _label_vertex(self, x, y):
         vertex = self.find_vertex_by_position(x, y)
         ask = simpledialog.askinteger("Label Vertex", f"Label Vertex:")
-        vertex.add_label(ask)
+        self._relabel(vertex, ask)
     
     def _delete_vertex(self, x, y):
         vertex = self.find_vertex_by_position(x, y)
         if vertex:
+            state = vertex_state(self.graph, vertex)
+            self.erase_vertex(vertex)
             self.graph.remove_vertex(vertex)
+            self.journal.record({'op': 'remove_vertex', 'id': vertex.id}, state)
         else:
             ask = messagebox.askyesno("Delete Graph", "Delete the Entire Graph?")
             if ask:
                 self.graph.clear()
+                self.journal.record({'op': 'clear'})
+                self.update_edges()
     
     def _line_graph(self):
         ask = messagebox.askokcancel("Line Graph", "Perform Line Graph?")
         if ask:
-            self.graph.line_graph()
+            graph = self.graph
+            csr, positions = self._frozen_state(graph)
+            self.run_job(
+                "Line Graph", lambda progress: graph.line_graph(progress, csr, positions), self.set_graph, source=graph
+            )
+
+    def _label_by_bfs(self):
+        vertex = self.selected_vertex
+        if vertex is None:
+            return messagebox.showerror("Error", "Select a vertex first.")
+        graph = self.graph
+        # The worker fills the graph's cache; labelling then only touches the canvas.
+        self.run_job(
+            "BFS Algorithm", lambda progress: graph.bfs_distances(vertex),
+            lambda _: self._record_bulk(labels_state, lambda: graph.label_by_bfs(vertex)), source=graph
+        )
+
+    def _distance_distribution(self):
+        vertex = self.selected_vertex
+        if vertex is None:
+            return messagebox.showerror("Error", "Select a vertex first.")
+        graph = self.graph
+        self.run_job(
+            "Distance Distribution", lambda progress: graph.distance_distribution(vertex),
+            lambda distribution: self.show_solution_box(f"The Distance Distribution is: {distribution}"),
+            source=graph
+        )
+
+    def _layout(self, relax=False):
+        graph = self.graph
+        csr, positions = self._frozen_state(graph)
+        # canvas=None: the layout runs off the Tk thread, so it uses the default canvas size.
+        if relax:
+            compute = lambda progress: graph.relax_layout(progress=progress, csr=csr, positions=positions)
+        else:
+            compute = lambda progress: graph.spring_layout(progress=progress, csr=csr)
+        self.run_job("Relax" if relax else "Spring Layout", compute, self._apply_layout, source=graph)
+
+    def _apply_layout(self, positions):
+        self._record_bulk(positions_state, lambda: self.graph.set_positions(positions))
+        self.update_edges()
+
+    def _color_graph(self):
+        graph = self.graph
+        # Exact branch and bound is quick on the small graphs drawn by hand,
+        # and reports progress, so Cancel stops it if it isn't.
+        method = 'exact' if len(graph.vertex_index) <= EXACT_COLORING_LIMIT else 'dsatur'
+        self.run_job(
+            "Color Graph", lambda progress: graph.vertex_coloring(method, progress=progress),
+            lambda colors: self._apply_coloring(method),
+            source=graph
+        )
+
+    def _apply_coloring(self, method):
+        count = self._record_bulk(labels_state, lambda: self.graph.color_vertices(method))
+        self.show_solution_box(f"Colored with {count} colors ({method}).")
+
+    def _check_coloring(self):
+        conflicts = self.graph.coloring_conflicts()
+        uncolored = sum(1 for vertex in self.graph.vertices if not vertex.labels)
+        self.clear_highlights()
+        if conflicts:
+            self.highlight_edges([self.edge_key(start.id, end.id) for start, end in conflicts], 'red')
+            return messagebox.showerror("Miscoloring", f"{len(conflicts)} edges join vertices of the same color.")
+        self.show_solution_box(f"Proper coloring ({uncolored} vertices uncolored).")
+
+    # Journal
+    def _record_bulk(self, state, change):
+        """Run `change`, which touches every vertex, and journal it as one entry of `state` before and after."""
+        before = state(self.graph)
+        result = change()
+        self.journal.record(state(self.graph), before)
+        return result
+
+    def _autosave(self):
+        self.journal.sync()
+        if self.journal.needs_compaction():
+            self.journal.compact(self.graph, background=True)
+        self.root.after(1000, self._autosave)
+
+    def undo(self):
+        if self.journal.undo(self.graph):
+            self.update_edges()
+
+    def redo(self):
+        if self.journal.redo(self.graph):
+            self.update_edges()
+
+    # Animation
+    def animate(self, algorithm):
+        """Play `algorithm` ('bfs' or 'dfs') from the selected vertex step by step."""
+        vertex = self.selected_vertex
+        if vertex is None:
+            return messagebox.showerror("Error", "Select a vertex first.")
+        steps = {'bfs': self.graph.bfs_steps, 'dfs': self.graph.dfs_steps}[algorithm]
+        self.stop_animation()
+        # A few hundred frames (several seconds) whatever the size of the graph.
+        rate = max(1, len(self.graph.vertex_index) // 100)
+        self.animation = Animation(self, steps(vertex), events_per_frame=rate).start()
+        self.pause_button.config(text="Pause")
+
+    def toggle_animation(self):
+        if self.animation is None:
+            return
+        if self.animation.paused:
+            self.animation.resume()
+            self.pause_button.config(text="Pause")
+        else:
+            self.animation.pause()
+            self.pause_button.config(text="Resume")
+
+    def step_animation(self):
+        if self.animation is not None:
+            self.animation.step()
+            self.pause_button.config(text="Resume")
+
+    def stop_animation(self):
+        """Stop playback and restore the canvas from the graph."""
+        if self.animation is not None:
+            self.animation.stop()
+            self.animation = None
+            self.update_edges()
+
+    # Jobs
+    def _frozen_state(self, graph):
+        """The snapshot and a read-only copy of the positions, read here so jobs never walk dicts the UI edits."""
+        positions = graph.positions()
+        positions.setflags(write=False)
+        return graph.snapshot(), positions
+
+    def run_job(self, name, compute, apply, source=None, poll_ms=50):
+        """
+            Run `compute(progress)` on a worker thread and pass its result to
+            `apply` on the Tk thread. If `source` is the graph being read, a
+            result is dropped when that graph was edited or replaced meanwhile.
+        """
+        if self.job is not None:
+            state = "being cancelled" if self.job.cancelled else "still running"
+            return messagebox.showinfo("Busy", f"{self.job.name} is {state}.")
+        version = None
+        if source is not None:
+            version = source.version
+            # Build the snapshot here so the worker doesn't walk dicts the UI may edit.
+            source.snapshot()
+        self.job = Job(compute, name).start()
+        self.cancel_button.config(state=tk.NORMAL)
+        self.root.after(poll_ms, self._poll_job, self.job, apply, source, version, poll_ms)
+
+    def _poll_job(self, job, apply, source, version, poll_ms):
+        if job is not self.job:
+            return
+        if not job.done:
+            if job.cancelled:
+                self.status.config(text=f"Cancelling {job.name}...")
+            else:
+                progress = "..." if job.progress is None else f" {job.progress:.0%}"
+                self.status.config(text=f"{job.name}{progress}")
+            self.root.after(poll_ms, self._poll_job, job, apply, source, version, poll_ms)
+            return
+        self._end_job()
+        if job.cancelled:
+            self.status.config(text=f"{job.name} cancelled")
+        elif source is not None and (source is not self.graph or source.version != version):
+            self.status.config(text=f"{job.name}: graph changed, result discarded")
+        elif job.error is not None:
+            messagebox.showerror(job.name, str(job.error))
+        else:
+            apply(job.result)
+
+    def cancel_job(self):
+        """
+            Ask the job to stop. Jobs stop at their next progress report; ones
+            that never report run to the end. Either way the job stays busy,
+            and its result is dropped, until its thread has exited.
+        """
+        if self.job is None or self.job.cancelled:
+            return
+        self.job.cancel()
+        self.cancel_button.config(state=tk.DISABLED)
+        self.status.config(text=f"Cancelling {self.job.name}...")
+
+    def _end_job(self):
+        self.job = None
+        self.status.config(text="")
+        self.cancel_button.config(state=tk.DISABLED)
+
+    def set_graph(self, graph, journal=None):
+        """
+            Show `graph`, journaling edits to `journal`. Graphs without one,
+            like generated and line graphs, are only kept in memory until
+            they are exported.
+        """
+        self.stop_animation()
+        self.graph = graph
+        self.selected_vertex = None
+        self.path_start = None
+        if hasattr(self, 'edge_start'):
+            del self.edge_start
         self.update_edges()
+        self.journal.close()
+        self.journal = journal or EditJournal()
     
     # External
     def find_vertex(self, x, y, radius=10):
-        for vertex in self.graph.vertices:
-            if (vertex.x - radius <= x <= vertex.x + radius) and (vertex.y - radius <= y <= vertex.y + radius):
-                return vertex
-        return None
+        return self.graph.spatial_index.query_point(x, y, radius=radius)
     
     def find_vertex_by_position(self, x, y):
-        for vertex in self.graph.vertices:
-            if vertex.contains_point(x, y):
-                return vertex
-        return None
+        return self.graph.spatial_index.query_point(x, y)
+
+    def find_vertices_in_region(self, x1, y1, x2, y2):
+        return self.graph.spatial_index.query_region(x1, y1, x2, y2)
     
     def select_vertex(self, x, y):
         if self.selected_vertex:
@@ -107,13 +467,17 @@ class GraphBuilder:
             for state, data in self.states.items():
                 if self.current_state == state:
                     data['method'](event.x, event.y)
-            self.update_edges()
         def on_canvas_drag(event):
             if self.current_state == 'move_vertex' and self.selected_vertex:
                 self._move_vertex(event.x, event.y)
-            self.update_edges()
+        def on_canvas_release(event):
+            if self.current_state == 'move_vertex':
+                self._end_move()
         self.canvas.bind("<Button-1>", on_canvas_click)
         self.canvas.bind("<B1-Motion>", on_canvas_drag)
+        self.canvas.bind("<ButtonRelease-1>", on_canvas_release)
+        self.root.bind("<Control-z>", lambda event: self.undo())
+        self.root.bind("<Control-y>", lambda event: self.redo())
 
     # UI Methods
     def setup_ui(self):
@@ -136,7 +500,7 @@ class GraphBuilder:
             },
             'move_vertex': {
                 'name': "Move Vertex",
-                'method': self.select_vertex,
+                'method': self._select_to_move,
                 'element': tk.Button(self.root, command=lambda: self.set_state('move_vertex'))
             },
             'color_vertex': {
@@ -144,6 +508,11 @@ class GraphBuilder:
                 'method': self._color_vertex,
                 'element': tk.Button(self.root, command=lambda: self.set_state('color_vertex'))
             },
+            'shortest_path': {
+                'name': "Shortest Path",
+                'method': self._shortest_path,
+                'element': tk.Button(self.root, command=lambda: self.set_state('shortest_path'))
+            },
             'delete': {
                 'name': "Delete",
                 'method': self._delete_vertex,
@@ -159,19 +528,51 @@ class GraphBuilder:
 
         self.distance_distribution = tk.Button(
             button_frame, text="Distance Distribution",
-            command=lambda: self.show_solution_box(f"The Distance Distribution is: {self.graph.distance_distribution(self.selected_vertex)}"),
+            command=self._distance_distribution,
+            bg='lightblue'
+        )
+        self.graph_distances = tk.Button(
+            button_frame, text="Graph Distances",
+            command=self.show_graph_distances,
             bg='lightblue'
         )
         self.line_graph_button = tk.Button(button_frame, text="Line Graph", command=self._line_graph, bg='lightblue')
         self.export_graph = tk.Button(button_frame, bg="lightgreen", text="Export Graph", command=self.export_new_graph)
         self.import_graph = tk.Button(button_frame, bg="lightgreen", text="Import Graph", command=self.import_new_graph)
-        self.bfs_algo_button = tk.Button(button_frame, bg='lightyellow', text="BFS Algorithm", command=lambda: self.graph.label_by_bfs(self.selected_vertex))
+        self.bfs_algo_button = tk.Button(button_frame, bg='lightyellow', text="BFS Algorithm", command=self._label_by_bfs)
+        self.cancel_button = tk.Button(button_frame, text="Cancel", command=self.cancel_job, state=tk.DISABLED)
+        self.status = tk.Label(button_frame, text="", bg='white')
+        self.animate_bfs_button = tk.Button(button_frame, bg='lightyellow', text="Animate BFS", command=lambda: self.animate('bfs'))
+        self.animate_dfs_button = tk.Button(button_frame, bg='lightyellow', text="Animate DFS", command=lambda: self.animate('dfs'))
+        self.pause_button = tk.Button(button_frame, text="Pause", command=self.toggle_animation)
+        self.step_button = tk.Button(button_frame, text="Step", command=self.step_animation)
+        self.stop_button = tk.Button(button_frame, text="Stop", command=self.stop_animation)
+        self.layout_button = tk.Button(button_frame, bg='lightblue', text="Spring Layout", command=self._layout)
+        self.color_button = tk.Button(button_frame, bg='lightyellow', text="Color Graph", command=self._color_graph)
+        self.check_color_button = tk.Button(button_frame, bg='lightyellow', text="Check Coloring", command=self._check_coloring)
+        self.relax_button = tk.Button(button_frame, bg='lightblue', text="Relax", command=lambda: self._layout(relax=True))
+        self.undo_button = tk.Button(button_frame, text="Undo", command=self.undo)
+        self.redo_button = tk.Button(button_frame, text="Redo", command=self.redo)
 
         self.distance_distribution.grid(row=0, column=0, padx=5, pady=5)
         self.line_graph_button.grid(row=0, column=1, padx=5, pady=5)
         self.import_graph.grid(row=0, column=2, padx=5, pady=5)
         self.export_graph.grid(row=0, column=3, padx=5, pady=5)
         self.bfs_algo_button.grid(row=1, column=0, padx=5, pady=5)
+        self.graph_distances.grid(row=1, column=1, padx=5, pady=5)
+        self.cancel_button.grid(row=1, column=2, padx=5, pady=5)
+        self.status.grid(row=1, column=3, padx=5, pady=5)
+        self.animate_bfs_button.grid(row=2, column=0, padx=5, pady=5)
+        self.animate_dfs_button.grid(row=2, column=1, padx=5, pady=5)
+        self.pause_button.grid(row=2, column=2, padx=5, pady=5)
+        self.step_button.grid(row=2, column=3, padx=5, pady=5)
+        self.stop_button.grid(row=3, column=0, padx=5, pady=5)
+        self.layout_button.grid(row=3, column=1, padx=5, pady=5)
+        self.relax_button.grid(row=3, column=2, padx=5, pady=5)
+        self.color_button.grid(row=3, column=3, padx=5, pady=5)
+        self.check_color_button.grid(row=4, column=0, padx=5, pady=5)
+        self.undo_button.grid(row=4, column=1, padx=5, pady=5)
+        self.redo_button.grid(row=4, column=2, padx=5, pady=5)
     
     def update_button_colors(self):
         for state, data in self.states.items():
@@ -180,15 +581,60 @@ class GraphBuilder:
             else:
                 data['element'].config(bg='grey' if self.current_state == state else 'white')
 
+    def edge_key(self, start_id, end_id):
+        if self.graph.directed or start_id <= end_id:
+            return (start_id, end_id)
+        return (end_id, start_id)
+
+    def incident_edge_keys(self, vertex):
+        keys = [self.edge_key(vertex.id, neighbor_id) for neighbor_id in self.graph.edges[vertex.id]]
+        if self.graph.directed:
+            keys.extend((source_id, vertex.id) for source_id in self.graph.in_edges[vertex.id])
+        return keys
+
     def draw_edge(self, start_vertex, end_vertex):
+        key = self.edge_key(start_vertex.id, end_vertex.id)
+        if key in self.edge_items:
+            return
         x1, y1 = start_vertex.x, start_vertex.y
         x2, y2 = end_vertex.x, end_vertex.y
-        self.canvas.create_line(x1, y1, x2, y2, fill='black')
+        line = self.canvas.create_line(x1, y1, x2, y2, fill='black')
+        self.canvas.tag_lower(line)
+        self.edge_items[key] = line
+
+    def move_edges(self, vertex):
+        for key in self.incident_edge_keys(vertex):
+            line = self.edge_items.get(key)
+            if line is not None:
+                start, end = self.graph.get_vertex_by_id(key[0]), self.graph.get_vertex_by_id(key[1])
+                self.canvas.coords(line, start.x, start.y, end.x, end.y)
+
+    def erase_vertex(self, vertex):
+        for key in self.incident_edge_keys(vertex):
+            line = self.edge_items.pop(key, None)
+            if line is not None:
+                self.canvas.delete(line)
+        vertex.erase()
+
+    def highlight_edges(self, keys, color):
+        for key in keys:
+            line = self.edge_items.get(key)
+            if line is not None:
+                self.canvas.itemconfig(line, fill=color, width=3)
+                self.highlighted.append(line)
+
+    def clear_highlights(self):
+        for line in self.highlighted:
+            self.canvas.itemconfig(line, fill='black', width=1)
+        self.highlighted = []
 
     def update_edges(self):
+        """Redraw the whole graph; used after bulk changes such as imports."""
         self.canvas.delete("all")
+        self.edge_items = {}
+        self.highlighted = []
         for vertex in self.graph.vertices:
-            vertex.vertex_id = vertex.draw_vertex()
+            vertex.draw_vertex(self.canvas)
             vertex.update_labels()
         for start_label, end_labels in self.graph.edges.items():
             start_vertex = self.graph.get_vertex_by_id(start_label)
@@ -206,32 +652,64 @@ class GraphBuilder:
     def show_solution_box(self, text):
         messagebox.showinfo("Info", text)
 
+    def show_graph_distances(self):
+        graph = self.graph
+        def compute(progress):
+            # The all-pairs BFS is the slow part; the rest read its cached result.
+            stats = graph.distance_stats(progress=progress)
+            return (
+                f"Distance Distribution: {stats['histogram']}\n"
+                f"Diameter: {graph.diameter()}\n"
+                f"Radius: {graph.radius()}\n"
+                f"Wiener Index: {graph.wiener_index()}"
+            )
+        self.run_job("Graph Distances", compute, self.show_solution_box, source=graph)
+
     def export_new_graph(self):
         text = simpledialog.askstring("Export Graph", "Name your Graph:")
         self.graph.name = text
         self.graph.export_graph_data(filename=text)
+        # Keep journaling under the new name, so later edits land next to this
+        # file; an older log under that name described the file just replaced.
+        self.journal.close()
+        self.journal = EditJournal(text)
+        self.journal.discard()
     
     def import_new_graph(self):
         filename = simpledialog.askstring("Import Graph", "Search Graph by Name:")
         if not filename:
             return messagebox.showerror("Error", f"Graph with name {filename} doesn't exist!")
         
-        for class_name, class_val in self.graph.classes.items():
-            self.graph.clear()
-            if filename == class_name:
-                name = class_val["name"]
-                params = class_val["params"]
-                func = class_val["function"]
-                func_params = []
-                for param in params:
-                    ask = simpledialog.askinteger(name, f"Choose {param}:")
-                    func_params.append(ask)
-                func(self.canvas, *func_params)
-                self.update_edges()
-                return None
-            
-        self.graph.import_graph_data(filename, self.canvas)
-        self.update_edges()
+        # Build into a fresh headless graph on the worker; the canvas only
+        # sees it once it's complete. Tk isn't thread-safe, so generators get
+        # no canvas and lay out on the default 500x400 area.
+        graph = Graph(filename)
+        if os.path.isfile(filename) and not filename.endswith('.json'):
+            # A path to an external edge list (SNAP, Matrix Market or DIMACS).
+            def build(progress):
+                graph.import_edge_list(filename, progress=progress)
+        elif filename in graph.classes:
+            class_val = graph.classes[filename]
+            name = class_val["name"]
+            graph.name = name
+            func = class_val["function"]
+            func_params = []
+            for param in class_val["params"]:
+                ask = simpledialog.askinteger(name, f"Choose {param}:")
+                func_params.append(ask)
+            def build(progress):
+                func(None, *func_params)
+        else:
+            def build(progress):
+                graph.import_graph_data(filename)
+                # Edits made after that file was last saved.
+                journal = EditJournal(filename)
+                journal.replay(graph)
+                return journal
+
+        def compute(progress):
+            return graph, build(progress)
+        self.run_job(f"Import {filename}", compute, lambda result: self.set_graph(*result))
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,70 @@
+import time
+
+import numpy as np
+
+from backend.csr import CSRGraph
+from backend.isomorphism import find_isomorphism
+
+
+def graph_pair(n, sources, targets, directed=False, seed=0):
+    """A graph and a random relabelling of it."""
+    permutation = np.random.default_rng(seed).permutation(n)
+    return (
+        CSRGraph.from_edges(n, sources, targets, directed=directed),
+        CSRGraph.from_edges(n, permutation[sources], permutation[targets], directed=directed),
+    )
+
+
+def is_isomorphism(csr1, csr2, mapping):
+    for v in range(csr1.num_vertices):
+        image = sorted(mapping[u] for u in csr1.indices[csr1.indptr[v]:csr1.indptr[v + 1]])
+        if image != sorted(csr2.indices[csr2.indptr[mapping[v]]:csr2.indptr[mapping[v] + 1]].tolist()):
+            return False
+    return True
+
+
+def star(leaves):
+    return graph_pair(leaves + 1, np.zeros(leaves, dtype=np.int64), np.arange(1, leaves + 1))
+
+
+def test_star():
+    first, second = star(1100)
+    start = time.perf_counter()
+    mapping = find_isomorphism(first, second)
+    assert time.perf_counter() - start < 2
+    assert mapping is not None and is_isomorphism(first, second, mapping)
+
+
+def test_empty_graph():
+    empty = CSRGraph.from_edges(1200, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+    start = time.perf_counter()
+    assert find_isomorphism(empty, empty) == list(range(1200))
+    assert time.perf_counter() - start < 2
+
+
+def test_complete_graph():
+    sources, targets = np.triu_indices(300, 1)
+    first, second = graph_pair(300, sources, targets)
+    mapping = find_isomorphism(first, second)
+    assert mapping is not None and is_isomorphism(first, second, mapping)
+
+
+def test_star_is_not_a_path():
+    path = CSRGraph.from_edges(4, np.arange(3), np.arange(1, 4))
+    assert find_isomorphism(star(3)[0], path) is None
+
+
+def test_random_graphs():
+    rng = np.random.default_rng(1)
+    for directed in (False, True):
+        for _ in range(20):
+            sources, targets = rng.integers(0, 30, size=(2, 60))
+            first, second = graph_pair(30, sources, targets, directed, seed=int(rng.integers(1 << 30)))
+            mapping = find_isomorphism(first, second)
+            assert mapping is not None and is_isomorphism(first, second, mapping)
+            # Moving one edge endpoint keeps the edge count but usually breaks isomorphism.
+            targets = targets.copy()
+            targets[0] = (targets[0] + 1) % 30
+            other = CSRGraph.from_edges(30, sources, targets, directed=directed)
+            mapping = find_isomorphism(first, other)
+            assert mapping is None or is_isomorphism(first, other, mapping)
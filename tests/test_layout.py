@@ -0,0 +1,35 @@
+import time
+
+import numpy as np
+
+from backend.csr import CSRGraph
+from backend.layout import CELL_SAMPLE, _neighbor_pairs, relax
+
+
+def test_neighbor_pairs_are_exact_when_sparse():
+    positions = np.random.default_rng(0).uniform(0, 100, size=(500, 2))
+    sources, targets, weights = _neighbor_pairs(positions, 10)
+    cells = np.floor((positions - positions.min(axis=0)) / 10).astype(np.int64)
+    close = np.abs(cells[:, None, :] - cells[None, :, :]).max(axis=2) <= 1
+    assert len(sources) == np.triu(close, 1).sum()
+    assert (weights == 1).all()
+
+
+def test_crowded_cells_are_sampled():
+    positions = np.zeros((2000, 2))
+    sources, targets, weights = _neighbor_pairs(positions, 1.0)
+    assert len(sources) <= len(positions) * CELL_SAMPLE
+    assert (sources != targets).all()
+    keys = np.minimum(sources, targets) * len(positions) + np.maximum(sources, targets)
+    assert len(np.unique(keys)) == len(keys)
+    # The weights stand in for every pair of the cell.
+    assert np.isclose(weights.sum(), 2000 * 1999 / 2)
+
+
+def test_relax_degenerate_layout():
+    n = 5000
+    csr = CSRGraph.from_edges(n, np.arange(n - 1), np.arange(1, n))
+    start = time.perf_counter()
+    positions = relax(csr, np.full((n, 2), 50.0))
+    assert time.perf_counter() - start < 2
+    assert positions.shape == (n, 2) and np.isfinite(positions).all()
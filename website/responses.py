@@ -0,0 +1,53 @@
+from collections import OrderedDict
+import gzip
+import hashlib
+import json
+
+from flask import Response
+
+
+class EncodedPayload:
+    """A JSON body encoded once, with its gzip form and strong ETags."""
+    def __init__(self, data):
+        self.body = json.dumps(data, separators=(',', ':')).encode()
+        self.gzip_body = gzip.compress(self.body, compresslevel=6)
+        self.etag = hashlib.sha1(self.body).hexdigest()
+        self.gzip_etag = f"{self.etag}-gzip"
+
+    def response(self, request, headers=None):
+        use_gzip = request.accept_encodings['gzip'] > 0
+        etag = self.gzip_etag if use_gzip else self.etag
+        if request.if_none_match.contains(self.etag) or request.if_none_match.contains(self.gzip_etag):
+            response = Response(status=304)
+        else:
+            response = Response(self.gzip_body if use_gzip else self.body, mimetype='application/json')
+            if use_gzip:
+                response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(etag)
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = 'no-cache'
+        for key, value in (headers or {}).items():
+            response.headers[key] = value
+        return response
+
+
+class ResponseCache:
+    """
+        Encoded payloads keyed by name and invalidated by a version token,
+        such as a file's mtime. Holds at most `max_entries` payloads.
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key, version, build):
+        cached = self.entries.get(key)
+        if cached is not None and cached[0] == version:
+            self.entries.move_to_end(key)
+            return cached[1]
+        payload = EncodedPayload(build())
+        self.entries[key] = (version, payload)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return payload
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from backend.definitions import Graph
+
+
+def finite(value):
+    return None if value == float('inf') else value
+
+
+def compute_stats(name, data):
+    graph = Graph(name)
+    graph.load_graph_data(data)
+    csr = graph.snapshot()
+    return {
+        "num_vertices": csr.num_vertices,
+        "num_edges": csr.num_edges,
+        "degree_sequence": sorted(csr.degrees().tolist(), reverse=True),
+        "connected_components": len(graph.connected_components()),
+        "diameter": finite(graph.diameter()),
+        "girth": finite(graph.girth()),
+        "bipartite": graph.is_bipartite(),
+        "distance_distribution": graph.all_distance_distribution().tolist(),
+    }
+
+
+class StatsCache:
+    """
+        Graph statistics stored on disk under the SHA-256 of the graph file, so
+        they are computed once per version of each graph.
+    """
+    def __init__(self, store, directory='.stats'):
+        self.store = store
+        self.directory = os.path.join(store.folder_path, directory)
+        self.hashes = {}
+        self.lock = threading.Lock()
+
+    def content_hash(self, name):
+        mtime = self.store.mtime(name)
+        with self.lock:
+            cached = self.hashes.get(name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(self.store.path(name), 'rb') as graph_file:
+            digest = hashlib.sha256(graph_file.read()).hexdigest()
+        with self.lock:
+            self.hashes[name] = (mtime, digest)
+        return digest
+
+    def get(self, name):
+        path = os.path.join(self.directory, f"{self.content_hash(name)}.json")
+        if os.path.exists(path):
+            with open(path, 'r') as stats_file:
+                return json.load(stats_file)
+        stats = compute_stats(name, self.store.get(name))
+        os.makedirs(self.directory, exist_ok=True)
+        # A unique temporary per writer: the warm thread and request threads can race on one graph.
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(handle, 'w') as stats_file:
+            json.dump(stats, stats_file)
+        os.replace(temporary, path)
+        return stats
+
+    def warm(self):
+        for name in self.store.names():
+            try:
+                self.get(name)
+            except KeyError:
+                continue
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+import json
+import os
+import threading
+
+
+class GraphStore:
+    """
+        Read-through cache over a folder of graph JSON files. Files are listed
+        on demand, loaded on first use, kept in an LRU of at most `max_graphs`
+        entries and reloaded when their modification time changes.
+    """
+    def __init__(self, path, max_graphs=64):
+        folder_path = os.path.join(os.path.dirname(__file__), path)
+        self.folder_path = os.path.normpath(folder_path)
+        self.max_graphs = max_graphs
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def path(self, name):
+        if not name or os.path.basename(name) != name:
+            raise KeyError(name)
+        return os.path.join(self.folder_path, f"{name}.json")
+
+    def names(self):
+        return sorted(
+            filename[:-len('.json')]
+            for filename in os.listdir(self.folder_path)
+            if filename.endswith('.json')
+        )
+
+    def mtime(self, name):
+        try:
+            return os.stat(self.path(name)).st_mtime_ns
+        except FileNotFoundError:
+            raise KeyError(name)
+
+    def get(self, name):
+        mtime = self.mtime(name)
+        with self.lock:
+            cached = self.cache.get(name)
+            if cached is not None and cached[0] == mtime:
+                self.cache.move_to_end(name)
+                return cached[1]
+        with open(self.path(name), 'r') as json_file:
+            data = json.load(json_file)
+        with self.lock:
+            self.cache[name] = (mtime, data)
+            self.cache.move_to_end(name)
+            while len(self.cache) > self.max_graphs:
+                self.cache.popitem(last=False)
+        return data
+
+    def __contains__(self, name):
+        try:
+            self.mtime(name)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self.names())
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def items(self):
+        for name in self.names():
+            try:
+                yield name, self.get(name)
+            except KeyError:
+                continue
+
+    def values(self):
+        for _, data in self.items():
+            yield data
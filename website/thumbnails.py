@@ -0,0 +1,137 @@
+import os
+import tempfile
+import struct
+import zlib
+
+import numpy as np
+
+# Stored positions are in GraphBuilder canvas coordinates.
+CANVAS_SIZE = (500, 400)
+
+COLORS = {
+    "black": (0, 0, 0),
+    "white": (255, 255, 255),
+    "blue": (0, 0, 255),
+    "red": (255, 0, 0),
+    "green": (0, 128, 0),
+    "yellow": (255, 255, 0),
+    "purple": (128, 0, 128),
+    "orange": (255, 165, 0),
+    "pink": (255, 192, 203),
+    "brown": (165, 42, 42),
+    "gray": (128, 128, 128),
+    "cyan": (0, 255, 255),
+}
+
+
+def vertex_color(vertex_data):
+    labels = vertex_data.get('labels') or []
+    if labels and isinstance(labels[0], str) and labels[0] in COLORS:
+        return labels[0]
+    return "black"
+
+
+def layout(data, width, height):
+    """Scaled vertex positions, colours and each undirected edge once, as index pairs."""
+    names = list(data)
+    index = {name: i for i, name in enumerate(names)}
+    positions = np.array([data[name]['position'] for name in names], dtype=np.float64).reshape(-1, 2)
+    positions *= (width / CANVAS_SIZE[0], height / CANVAS_SIZE[1])
+    edges = {
+        (min(index[name], index[neighbor]), max(index[name], index[neighbor]))
+        for name in names
+        for neighbor in data[name]['neighbors']
+    }
+    edges = np.array(sorted(edges), dtype=np.int64).reshape(-1, 2)
+    colors = [vertex_color(data[name]) for name in names]
+    return positions, edges, colors
+
+
+def render_svg(data, width=300, height=240, radius=3, edge_width=1):
+    positions, edges, colors = layout(data, width, height)
+    path = ''.join(
+        f"M{x1:.1f} {y1:.1f}L{x2:.1f} {y2:.1f}"
+        for (x1, y1), (x2, y2) in zip(positions[edges[:, 0]].tolist(), positions[edges[:, 1]].tolist())
+    )
+    circles = ''.join(
+        f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{radius}" fill="{color}"/>'
+        for (x, y), color in zip(positions.tolist(), colors)
+    )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+        f'<path d="{path}" stroke="black" stroke-width="{edge_width}" fill="none"/>'
+        f'{circles}</svg>'
+    )
+
+
+def encode_png(image):
+    height, width, _ = image.shape
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = image.reshape(height, -1)
+
+    def chunk(kind, body):
+        return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body))
+
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        + chunk(b'IDAT', zlib.compress(rows.tobytes(), 9))
+        + chunk(b'IEND', b'')
+    )
+
+
+def render_png(data, width=300, height=240, radius=3):
+    positions, edges, colors = layout(data, width, height)
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+
+    if len(edges):
+        # Sample every edge about once per pixel of its length, all edges at once.
+        start, end = positions[edges[:, 0]], positions[edges[:, 1]]
+        samples = np.ceil(np.linalg.norm(end - start, axis=1)).astype(np.int64) + 1
+        owner = np.repeat(np.arange(len(edges)), samples)
+        step = np.arange(samples.sum()) - np.repeat(np.cumsum(samples) - samples, samples)
+        t = (step / np.maximum(samples[owner] - 1, 1))[:, None]
+        points = np.rint(start[owner] + (end - start)[owner] * t).astype(np.int64)
+        inside = (points[:, 0] >= 0) & (points[:, 0] < width) & (points[:, 1] >= 0) & (points[:, 1] < height)
+        image[points[inside, 1], points[inside, 0]] = 0
+
+    if len(positions):
+        dy, dx = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+        disk = np.stack((dx[dx ** 2 + dy ** 2 <= radius ** 2], dy[dx ** 2 + dy ** 2 <= radius ** 2]), axis=1)
+        centers = np.rint(positions).astype(np.int64)
+        pixels = (centers[:, None, :] + disk[None, :, :]).reshape(-1, 2)
+        fills = np.repeat(np.array([COLORS[color] for color in colors], dtype=np.uint8), len(disk), axis=0)
+        inside = (pixels[:, 0] >= 0) & (pixels[:, 0] < width) & (pixels[:, 1] >= 0) & (pixels[:, 1] < height)
+        image[pixels[inside, 1], pixels[inside, 0]] = fills[inside]
+
+    return encode_png(image)
+
+
+class ThumbnailCache:
+    """
+        Rendered thumbnails on disk, regenerated only when the source graph
+        file is newer than the cached image.
+    """
+    renderers = {
+        'svg': lambda data: render_svg(data).encode(),
+        'png': render_png,
+    }
+
+    def __init__(self, store, directory='.thumbnails'):
+        self.store = store
+        self.directory = os.path.join(store.folder_path, directory)
+
+    def get(self, name, fmt='svg'):
+        if fmt not in self.renderers:
+            raise KeyError(fmt)
+        source_mtime = self.store.mtime(name)
+        path = os.path.join(self.directory, f"{name}.{fmt}")
+        if os.path.exists(path) and os.stat(path).st_mtime_ns >= source_mtime:
+            return path
+        image = self.renderers[fmt](self.store.get(name))
+        os.makedirs(self.directory, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(handle, 'wb') as image_file:
+            image_file.write(image)
+        os.replace(temporary, path)
+        return path
@@ -1,21 +1,36 @@
-from flask import Flask, jsonify, render_template
-import json
+from flask import Flask, abort, jsonify, render_template, request, send_file
 import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(__file__), '..')))
+
+from website.responses import ResponseCache
+from website.stats import StatsCache
+from website.store import GraphStore
+from website.thumbnails import ThumbnailCache
 
 app = Flask(__name__)
 
-graphs = {}
+graphs = GraphStore('../storage/graphs')
+responses = ResponseCache()
+stats = StatsCache(graphs)
+thumbnails = ThumbnailCache(graphs)
+
+# Warm the stats on import, so `flask run` and WSGI servers get it too, not just __main__.
+threading.Thread(target=stats.warm, daemon=True).start()
 
-def get_storage(path, database):
-    folder_path = os.path.join(os.path.dirname(__file__), path)
-    folder_path = os.path.normpath(folder_path)
-    for filename in os.listdir(folder_path):
-        if filename.endswith('.json'):
-            file_path = os.path.join(folder_path, filename)
-            with open(file_path, 'r') as json_file:
-                data = json.load(json_file)
-                database[filename.replace('.json', '')] = data
-get_storage('../storage/graphs', graphs)
+def get_graph_or_404(graph_name):
+    try:
+        return graphs.get(graph_name)
+    except KeyError:
+        abort(404, description=f"Graph '{graph_name}' not found")
+
+def graph_summary(graph):
+    return {
+        "num_vertices": len(graph),
+        "num_edges": sum(len(v["neighbors"]) for v in graph.values())//2,
+    }
 
 @app.route('/')
 def home():
@@ -23,32 +38,79 @@ def home():
 
 @app.route('/graphs')
 def graph_page():
-    return render_template("graphs.html", graphs=graphs)
+    versions = {}
+    for name in graphs.names():
+        try:
+            versions[name] = graphs.mtime(name)
+        except KeyError:
+            continue
+    return render_template("graphs.html", graphs=versions)
+
+@app.route('/thumbnails/<graph_name>.<fmt>')
+def thumbnail(graph_name, fmt):
+    """Thumbnail URLs carry the graph version (?v=mtime), so they can be cached for a year."""
+    try:
+        path = thumbnails.get(graph_name, fmt)
+    except KeyError:
+        abort(404)
+    mimetype = 'image/svg+xml' if fmt == 'svg' else 'image/png'
+    return send_file(path, mimetype=mimetype, max_age=31536000)
 
 @app.route('/graphs/<graph_name>')
 def graph_detail(graph_name):
-    vertex = graphs[graph_name]
-    if vertex is None:
-        return "Graph not found", 404
+    vertex = get_graph_or_404(graph_name)
     details = {
         "graph_name": graph_name,
         "graph_details": vertex,
-        "num_vertices": len(list(vertex)),
-        "num_edges": sum([len(v["neighbors"]) for v in vertex.values()])//2,
+        "stats": stats.get(graph_name),
         "description": "No description yet"
     }
     return render_template("graph_details.html", **details)
 
 @app.route('/api/graphs', methods=['GET'])
 def get_vertices():
-    return jsonify(graphs)
+    """
+        ?summary=1 returns vertex and edge counts instead of adjacency.
+        ?page=N&per_page=M pages through graphs by name; the total count is
+        in the X-Total-Count header.
+    """
+    names = graphs.names()
+    total = len(names)
+    summary = request.args.get('summary', '').lower() in ('1', 'true', 'yes')
+    page = request.args.get('page', type=int)
+    if page is not None:
+        per_page = max(request.args.get('per_page', default=20, type=int), 1)
+        names = names[(max(page, 1) - 1) * per_page:max(page, 1) * per_page]
+    try:
+        version = tuple(graphs.mtime(name) for name in names)
+    except KeyError:
+        return jsonify({"error": "Graph library changed, retry"}), 409
+
+    def build():
+        if summary:
+            return {name: graph_summary(graphs.get(name)) for name in names}
+        return {name: graphs.get(name) for name in names}
+
+    payload = responses.get(('graphs', summary, tuple(names)), version, build)
+    return payload.response(request, headers={'X-Total-Count': str(total)})
+
+@app.route('/api/<graph_name>/stats', methods=['GET'])
+def get_stats(graph_name):
+    try:
+        version = stats.content_hash(graph_name)
+    except KeyError:
+        return jsonify({"error": "Graph not found"}), 404
+    payload = responses.get(('stats', graph_name), version, lambda: stats.get(graph_name))
+    return payload.response(request)
 
 @app.route('/api/<graph_name>', methods=['GET'])
 def get_vertex(graph_name):
-    vertex = graphs[graph_name]
-    if vertex is None:
-        return jsonify({"error": "Vertex not found"}), 404
-    return jsonify(vertex)
+    try:
+        version = graphs.mtime(graph_name)
+    except KeyError:
+        return jsonify({"error": "Graph not found"}), 404
+    payload = responses.get(('graph', graph_name), version, lambda: graphs.get(graph_name))
+    return payload.response(request)
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)